@@ -1,19 +1,106 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, make_response
 from flask_cors import CORS
 import joblib
 import numpy as np
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import copy
+import functools
+import io
+import math
 import os
+import random
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow IPC optionnel pour /api/predict/bulk
+    pa = None
+
+from shadow import ShadowEvaluator
+from neighbourhood import load_neighbourhood_table
+from jobs import JobManager, JobQueueFull
+from profiling import CLOCKS, ProfileStore, RequestProfiler
+from drift import DriftMonitor, load_baseline
+from singleflight import SingleFlight
+from market import load_market_stats
+from house_record import FEATURE_COLUMNS, FEATURE_RANGES, INT_FEATURES, HouseRecord
+from tiers import DEFAULT_TIER, INFERENCE_TIERS, tier_tree_count
+from intervals import INTERVAL_MODEL_PATHS, INTERVAL_QUANTILES
 
 app = Flask(__name__)
 CORS(app)  # Permet les requêtes cross-origin
 
 # Configuration
 ALLOWED_MODELS = ['random_forest', 'xgboost']
+ENSEMBLE_MODEL = 'ensemble'
+
+# Formats binaires acceptés par /api/predict/bulk
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+RAW_FLOAT32_MIMETYPE = 'application/octet-stream'
+
+def check_weight_values(weights):
+    """Vérifie la forme des poids d'ensemble : modèles connus, poids finis et positifs"""
+    if not isinstance(weights, dict) or not weights:
+        return False, "Les poids (weights) doivent être un objet {modèle: poids}"
+    
+    unknown = [name for name in weights if name not in ALLOWED_MODELS]
+    if unknown:
+        return False, f"Modèles inconnus dans weights: {', '.join(unknown)}"
+    
+    try:
+        values = [float(value) for value in weights.values()]
+    except (TypeError, ValueError):
+        return False, "Les poids doivent être numériques"
+    
+    # NaN et Infinity passeraient les comparaisons et produiraient un prix NaN
+    if not all(math.isfinite(value) for value in values):
+        return False, "Les poids doivent être des nombres finis"
+    
+    if any(value < 0 for value in values):
+        return False, "Les poids doivent être positifs ou nuls"
+    
+    return True, "Validation réussie"
+
+
+def parse_ensemble_weights(raw):
+    """Parse et valide les poids d'ensemble au format 'xgboost=0.7,random_forest=0.3'"""
+    weights = {}
+    for item in raw.split(','):
+        if not item.strip():
+            continue
+        name, separator, value = item.partition('=')
+        if not separator:
+            raise ValueError(f"ENSEMBLE_WEIGHTS invalide: '{item.strip()}' n'est pas de la forme modèle=poids")
+        weights[name.strip()] = value.strip()
+    
+    is_valid, validation_message = check_weight_values(weights)
+    if not is_valid:
+        raise ValueError(f"ENSEMBLE_WEIGHTS invalide: {validation_message}")
+    
+    return {name: float(value) for name, value in weights.items()}
+
+
+# Poids par défaut du mode ensemble (surchargeables par requête)
+ENSEMBLE_WEIGHTS = parse_ensemble_weights(
+    os.environ.get('ENSEMBLE_WEIGHTS', 'random_forest=0.5,xgboost=0.5')
+)
+
+# Pool de threads du mode ensemble : le premier modèle tourne sur le thread de
+# la requête, les autres dans ce pool, dimensionné pour ENSEMBLE_CONCURRENCY
+# requêtes ensemble simultanées afin qu'elles ne s'attendent pas entre elles
+ENSEMBLE_CONCURRENCY = int(os.environ.get('ENSEMBLE_CONCURRENCY', str(os.cpu_count() or 4)))
+ensemble_executor = ThreadPoolExecutor(
+    max_workers=ENSEMBLE_CONCURRENCY * max(1, len(ALLOWED_MODELS) - 1),
+    thread_name_prefix='ensemble'
+)
+
+# Coalescence des prédictions identiques simultanées
+prediction_flight = SingleFlight()
 
 # Chargement des modèles au démarrage de l'application
 models = {}
+interval_models = {}
 
 def load_models():
     """Charge les modèles ML au démarrage"""
@@ -28,175 +115,452 @@ def load_models():
         print("Modèle XGBoost chargé")
     except Exception as e:
         print(f"Erreur chargement XGBoost: {e}")
+    
+    try:
+        for bound, path in INTERVAL_MODEL_PATHS.items():
+            interval_models[bound] = joblib.load(path)
+        print("Modèles d'intervalle chargés")
+    except Exception as e:
+        interval_models.clear()
+        print(f"Intervalles de prédiction indisponibles: {e}")
 
 # Charger les modèles au démarrage
 load_models()
 
+# Modèle shadow : candidat évalué en arrière-plan sur le trafic réel
+shadow = None
 
-def validate_input(data):
-    """Valide les données d'entrée"""
-    required_fields = [
-        'grade', 
-        'waterfront', 
-        'sqft_living', 
-        'bathrooms', 
-        'lat', 
-        'view', 
-        'long', 
-        'yr_built', 
-        'zipcode', 
-        'sqft_lot', 
-        'sqft_basement', 
-        'annee_construction', 
-        'sqft_lot15', 
-        'condition', 
-        'yr_renovated'
-    ]
+def load_shadow_model():
+    """Enregistre le modèle shadow configuré par SHADOW_MODEL_PATH"""
+    global shadow
     
-    # Vérifier que tous les champs requis sont présents
-    missing_fields = [field for field in required_fields if field not in data]
-    if missing_fields:
-        return False, f"Champs manquants: {', '.join(missing_fields)}"
+    shadow_path = os.environ.get('SHADOW_MODEL_PATH')
+    if not shadow_path:
+        return
     
-    # Validation des types et des plages de valeurs
     try:
-        # grade: Note de construction (1-13)
-        grade = int(data['grade'])
-        if grade < 1 or grade > 13:
-            return False, "Le grade doit être entre 1 et 13"
-        
-        # waterfront: Vue sur l'eau (0 ou 1)
-        waterfront = int(data['waterfront'])
-        if waterfront not in [0, 1]:
-            return False, "Waterfront doit être 0 (Non) ou 1 (Oui)"
-        
-        # sqft_living: Surface habitable (100-20000)
-        sqft_living = float(data['sqft_living'])
-        if sqft_living < 100 or sqft_living > 20000:
-            return False, "La surface habitable (sqft_living) doit être entre 100 et 20000 sqft"
-        
-        # bathrooms: Nombre de salles de bain (0.5-10)
-        bathrooms = float(data['bathrooms'])
-        if bathrooms < 0.5 or bathrooms > 10:
-            return False, "Le nombre de salles de bain doit être entre 0.5 et 10"
-        
-        # lat: Latitude (-90 à 90)
-        lat = float(data['lat'])
-        if lat < -90 or lat > 90:
-            return False, "La latitude doit être entre -90 et 90"
-        
-        # view: Qualité de la vue (0-4)
-        view = int(data['view'])
-        if view < 0 or view > 4:
-            return False, "La qualité de la vue (view) doit être entre 0 et 4"
-        
-        # long: Longitude (-180 à 180)
-        long = float(data['long'])
-        if long < -180 or long > 180:
-            return False, "La longitude doit être entre -180 et 180"
-        
-        # yr_built: Année de construction (1800-année actuelle)
-        yr_built = int(data['yr_built'])
-        current_year = datetime.now().year
-        if yr_built < 1800 or yr_built > current_year:
-            return False, f"L'année de construction (yr_built) doit être entre 1800 et {current_year}"
-        
-        # zipcode: Code postal (5 chiffres)
-        zipcode = int(data['zipcode'])
-        if zipcode < 10000 or zipcode > 99999:
-            return False, "Le zipcode doit être un code postal valide (5 chiffres)"
+        shadow_model = joblib.load(shadow_path)
+        # Limiter le modèle shadow à un seul thread pour ne pas concurrencer la production
+        if hasattr(shadow_model, 'set_params') and 'n_jobs' in shadow_model.get_params():
+            shadow_model.set_params(n_jobs=1)
         
-        # sqft_lot: Surface du terrain (500-1000000)
-        sqft_lot = float(data['sqft_lot'])
-        if sqft_lot < 500 or sqft_lot > 1000000:
-            return False, "La surface du terrain (sqft_lot) doit être entre 500 et 1000000 sqft"
-        
-        # sqft_basement: Surface du sous-sol (0-10000)
-        sqft_basement = float(data['sqft_basement'])
-        if sqft_basement < 0 or sqft_basement > 10000:
-            return False, "La surface du sous-sol (sqft_basement) doit être entre 0 et 10000 sqft"
-        
-        # annee_construction: Année de construction (1800-année actuelle)
-        annee_construction = int(data['annee_construction'])
-        if annee_construction < 1800 or annee_construction > current_year:
-            return False, f"L'année de construction (annee_construction) doit être entre 1800 et {current_year}"
-        
-        # sqft_lot15: Surface moyenne des 15 terrains voisins (500-1000000)
-        sqft_lot15 = float(data['sqft_lot15'])
-        if sqft_lot15 < 500 or sqft_lot15 > 1000000:
-            return False, "La surface des terrains voisins (sqft_lot15) doit être entre 500 et 1000000 sqft"
-        
-        # condition: État de la maison (1-5)
-        condition = int(data['condition'])
-        if condition < 1 or condition > 5:
-            return False, "L'état de la maison (condition) doit être entre 1 et 5"
+        shadow = ShadowEvaluator(
+            name=os.environ.get('SHADOW_MODEL_NAME', os.path.basename(shadow_path)),
+            model=shadow_model,
+            sample_rate=float(os.environ.get('SHADOW_SAMPLE_RATE', '1.0')),
+            queue_size=int(os.environ.get('SHADOW_QUEUE_SIZE', '1000'))
+        )
+        print(f"Modèle shadow chargé: {shadow.name}")
+    except Exception as e:
+        print(f"Erreur chargement modèle shadow: {e}")
+
+load_shadow_model()
+
+# Table d'agrégats de voisinage (sqft_lot15 dérivé de lat/long)
+neighbourhood_table = load_neighbourhood_table(
+    os.environ.get('NEIGHBOURHOOD_TABLE_PATH', 'neighbourhood_table.npz')
+)
+if neighbourhood_table is not None:
+    print("Table de voisinage chargée")
+
+# Statistiques de marché par code postal, précalculées hors ligne
+market_stats = load_market_stats(os.environ.get('MARKET_STATS_PATH', 'market_stats.npz'))
+if market_stats is not None:
+    print("Statistiques de marché chargées")
+
+# Résumés de taille fixe des entrées et des prix prédits (suivi de dérive)
+drift_monitor = DriftMonitor(
+    FEATURE_COLUMNS,
+    baseline=load_baseline(os.environ.get('DRIFT_BASELINE_PATH', 'drift_baseline.json'))
+)
+
+
+def validate_input(data):
+    """Valide les données d'entrée"""
+    try:
+        record = HouseRecord.from_mapping(data)
+    except ValueError as e:
+        return False, str(e)
+    
+    return record.validate()
+
+
+def validate_frame(frame):
+    """Validation vectorisée d'un portefeuille
+    
+    Retourne une Series alignée sur `frame` contenant le message d'erreur de
+    chaque ligne invalide (NaN pour les lignes valides), et les colonnes
+    converties en numérique sur lesquelles la validation a porté.
+    """
+    errors = pd.Series(np.nan, index=frame.index, dtype=object)
+    numeric = pd.DataFrame(index=frame.index)
+    current_year = datetime.now().year
+    
+    for feature in FEATURE_COLUMNS:
+        if feature not in frame.columns:
+            errors[errors.isna()] = f"Champ manquant: {feature}"
+            continue
         
-        # yr_renovated: Année de rénovation (0 ou 1900-année actuelle)
-        yr_renovated = int(data['yr_renovated'])
-        if yr_renovated != 0 and (yr_renovated < 1900 or yr_renovated > current_year):
-            return False, f"L'année de rénovation (yr_renovated) doit être 0 (non rénové) ou entre 1900 et {current_year}"
+        values = numeric[feature] = pd.to_numeric(frame[feature], errors='coerce')
+        low, high = FEATURE_RANGES[feature]
+        high = current_year if high is None else high
+        invalid = values.isna() | (values < low) | (values > high)
+        if feature == 'yr_renovated':
+            invalid &= values != 0
         
-        return True, "Validation réussie"
+        errors[invalid & errors.isna()] = f"Valeur invalide pour {feature}"
     
-    except ValueError as e:
-        return False, f"Erreur de type de données: {str(e)}"
+    return errors, numeric
+
+
+def fill_context_frame(frame):
+    """Version vectorisée de fill_context_features pour un portefeuille"""
+    if neighbourhood_table is None or 'lat' not in frame.columns or 'long' not in frame.columns:
+        return frame
+    
+    context = neighbourhood_table.lookup_many(
+        pd.to_numeric(frame['lat'], errors='coerce'),
+        pd.to_numeric(frame['long'], errors='coerce')
+    )
+    for feature in neighbourhood_table.features:
+        if feature not in FEATURE_COLUMNS:
+            continue
+        derived = pd.Series(context[feature], index=frame.index).round()
+        if feature in frame.columns:
+            frame[feature] = frame[feature].fillna(derived)
+        else:
+            frame[feature] = derived
+    
+    return frame
+
+
+def fill_context_features(data):
+    """Complète les features de contexte absentes (sqft_lot15) à partir de lat/long
+    
+    Retourne une copie des données et la liste des champs dérivés.
+    """
+    if neighbourhood_table is None:
+        return data, []
+    
+    missing = [
+        f for f in neighbourhood_table.features
+        if f in FEATURE_COLUMNS and f not in data
+    ]
+    if not missing:
+        return data, []
+    
+    try:
+        context = neighbourhood_table.lookup(float(data['lat']), float(data['long']))
+    except (KeyError, TypeError, ValueError):
+        # La validation signalera les coordonnées manquantes ou invalides
+        return data, []
+    if context is None:
+        return data, []
+    
+    data = dict(data)
+    for feature in missing:
+        data[feature] = round(context[feature])
+    
+    return data, missing
 
 
 def prepare_features(data):
     """Prépare les features pour la prédiction dans l'ordre exact attendu par les modèles"""
-    features = pd.DataFrame({
-        'grade': [int(data['grade'])],
-        'waterfront': [int(data['waterfront'])],
-        'sqft_living': [float(data['sqft_living'])],
-        'bathrooms': [float(data['bathrooms'])],
-        'lat': [float(data['lat'])],
-        'view': [int(data['view'])],
-        'long': [float(data['long'])],
-        'yr_built': [int(data['yr_built'])],
-        'zipcode': [int(data['zipcode'])],
-        'sqft_lot': [float(data['sqft_lot'])],
-        'sqft_basement': [float(data['sqft_basement'])],
-        'annee_construction': [int(data['annee_construction'])],
-        'sqft_lot15': [float(data['sqft_lot15'])],
-        'condition': [int(data['condition'])],
-        'yr_renovated': [int(data['yr_renovated'])]
+    return HouseRecord.from_mapping(data).to_frame()
+
+
+def prepare_features_frame(frame):
+    """Version vectorisée de prepare_features pour un portefeuille déjà validé
+    
+    `frame` doit contenir des colonnes numériques (celles retournées par
+    validate_frame) : les chaînes comme "7.0" ne sont pas reconverties ici.
+    """
+    return frame[FEATURE_COLUMNS].astype({
+        feature: int if feature in INT_FEATURES else float
+        for feature in FEATURE_COLUMNS
     })
+
+
+def read_bulk_matrix(body, content_type):
+    """Décode une matrice de features binaire (n lignes x 15 colonnes, float32)
+    
+    Le format brut float32 little-endian est lu sans copie. Un flux Arrow
+    IPC est copié colonne par colonne dans une nouvelle matrice (une copie) ;
+    les colonnes contenant des valeurs nulles sont refusées.
+    """
+    if content_type == RAW_FLOAT32_MIMETYPE:
+        row_size = 4 * len(FEATURE_COLUMNS)
+        if len(body) % row_size:
+            raise ValueError(
+                f"La taille du corps ({len(body)} octets) n'est pas un multiple de {row_size} "
+                f"({len(FEATURE_COLUMNS)} features float32)"
+            )
+        return np.frombuffer(body, dtype='<f4').reshape(-1, len(FEATURE_COLUMNS))
     
-    return features
+    if content_type == ARROW_STREAM_MIMETYPE:
+        if pa is None:
+            raise RuntimeError("pyarrow n'est pas installé")
+        table = pa.ipc.open_stream(body).read_all()
+        missing = [f for f in FEATURE_COLUMNS if f not in table.column_names]
+        if missing:
+            raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
+        with_nulls = [f for f in FEATURE_COLUMNS if table.column(f).null_count > 0]
+        if with_nulls:
+            raise ValueError(f"Valeurs nulles dans les colonnes: {', '.join(with_nulls)}")
+        matrix = np.empty((table.num_rows, len(FEATURE_COLUMNS)), dtype=np.float32, order='F')
+        for i, feature in enumerate(FEATURE_COLUMNS):
+            matrix[:, i] = table.column(feature).to_numpy()
+        return matrix
+    
+    raise ValueError(f"Content-Type non supporté: {content_type}")
 
 
-@app.route('/')
-def home():
-    """Route d'accueil"""
-    return jsonify({
-        'message': 'API HomePricer - Prédiction de prix immobiliers',
-        'version': '1.0.0',
-        'endpoints': {
-            'health': '/health',
-            'predict': '/api/predict',
-            'models': '/api/models',
-            'info': '/api/info'
+def validate_tier(tier, model_name):
+    """Vérifie que le niveau demandé existe et s'applique au modèle"""
+    if tier not in INFERENCE_TIERS:
+        return False, f"Le tier doit être l'un de: {', '.join(INFERENCE_TIERS)}"
+    
+    if tier != DEFAULT_TIER and model_name == 'random_forest':
+        return False, "Les tiers tronqués ne s'appliquent qu'au modèle xgboost"
+    
+    return True, "Validation réussie"
+
+
+def tier_iteration_range(model, tier):
+    """Plage d'itérations (premiers arbres) correspondant au niveau demandé"""
+    if tier == DEFAULT_TIER:
+        return (0, 0)  # tous les arbres
+    
+    return (0, tier_tree_count(model.get_booster().num_boosted_rounds(), tier))
+
+
+def model_predict(model_name, features, tier=DEFAULT_TIER):
+    """Prédiction d'un modèle, tronquée aux premiers arbres pour XGBoost"""
+    model = models[model_name]
+    if model_name == 'xgboost' and tier != DEFAULT_TIER:
+        return model.predict(features, iteration_range=tier_iteration_range(model, tier))
+    return model.predict(features)
+
+
+def predict_matrix(model_name, matrix, tier=DEFAULT_TIER):
+    """Prédit sur une matrice NumPy dans l'ordre FEATURE_COLUMNS"""
+    model = models[model_name]
+    if model_name == 'xgboost':
+        # Prédiction en place : pas de DMatrix intermédiaire
+        return model.get_booster().inplace_predict(
+            matrix,
+            iteration_range=tier_iteration_range(model, tier),
+            validate_features=False
+        )
+    return model.predict(matrix)
+
+
+def write_bulk_predictions(predictions, content_type, lower=None, upper=None):
+    """Encode les prédictions dans le même format binaire que la requête
+    
+    Avec un intervalle, le format brut renvoie une matrice n x 3 (price,
+    lower, upper) et le flux Arrow trois colonnes.
+    """
+    predictions = np.asarray(predictions).astype('<f4', copy=False)
+    
+    if lower is not None:
+        columns = {
+            'price': predictions,
+            'lower': np.asarray(lower).astype('<f4', copy=False),
+            'upper': np.asarray(upper).astype('<f4', copy=False)
         }
-    }), 200
+    else:
+        columns = {'price': predictions}
+    
+    if content_type == ARROW_STREAM_MIMETYPE:
+        table = pa.table(columns)
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+    
+    if lower is not None:
+        return np.column_stack(list(columns.values())).astype('<f4', copy=False).tobytes()
+    return predictions.tobytes()
 
 
-@app.route('/health')
-def health():
+def validate_weights(weights):
+    """Valide les poids d'ensemble fournis dans la requête"""
+    is_valid, validation_message = check_weight_values(weights)
+    if not is_valid:
+        return False, validation_message
+    
+    # Le mélange est normalisé sur les modèles chargés : il en faut au moins un de poids non nul
+    if sum(float(weights[name]) for name in weights if name in models) <= 0:
+        return False, (
+            "Les poids doivent désigner au moins un modèle chargé avec un poids positif "
+            f"(modèles chargés: {', '.join(m for m in ALLOWED_MODELS if m in models)})"
+        )
+    
+    return True, "Validation réussie"
+
+
+def predict_ensemble(features, weights=None, tier=DEFAULT_TIER):
+    """Exécute tous les modèles chargés en parallèle sur les mêmes features
+    
+    Le premier modèle tourne sur le thread de la requête pendant que les
+    autres tournent dans le pool d'ensemble. Retourne les prédictions de
+    chaque modèle, le mélange pondéré et les poids normalisés effectivement
+    utilisés.
+    """
+    weights = ENSEMBLE_WEIGHTS if weights is None else weights
+    
+    loaded = [model_name for model_name in ALLOWED_MODELS if model_name in models]
+    model_tier = {
+        model_name: tier if model_name == 'xgboost' else DEFAULT_TIER
+        for model_name in loaded
+    }
+    
+    local_model, *pooled_models = loaded
+    futures = {
+        model_name: ensemble_executor.submit(
+            model_predict, model_name, features, model_tier[model_name]
+        )
+        for model_name in pooled_models
+    }
+    results = {local_model: model_predict(local_model, features, model_tier[local_model])}
+    results.update((model_name, future.result()) for model_name, future in futures.items())
+    predictions = {
+        model_name: np.asarray(results[model_name], dtype=float)
+        for model_name in loaded
+    }
+    
+    # Normaliser les poids sur les modèles effectivement chargés
+    total = sum(float(weights.get(model_name, 0)) for model_name in predictions)
+    if total <= 0:
+        raise ValueError("La somme des poids des modèles chargés doit être positive")
+    used_weights = {
+        model_name: float(weights.get(model_name, 0)) / total
+        for model_name in predictions
+    }
+    
+    blended = sum(
+        predictions[model_name] * weight
+        for model_name, weight in used_weights.items()
+    )
+    
+    return predictions, blended, used_weights
+
+
+def predict_interval(features, prices, tier=DEFAULT_TIER):
+    """Bornes des modèles de quantiles, ordonnées autour de la prédiction ponctuelle
+    
+    Exécuté sur le thread de la requête et au même tier que le modèle
+    principal : un tier rapide raccourcit aussi l'intervalle.
+    """
+    prices = np.asarray(prices, dtype=float)
+    bounds = {
+        bound: np.asarray(
+            model.predict(features, iteration_range=tier_iteration_range(model, tier)),
+            dtype=float
+        )
+        for bound, model in interval_models.items()
+    }
+    return np.minimum(bounds['lower'], prices), np.maximum(bounds['upper'], prices)
+
+
+def interval_details(lower, upper):
+    """Bloc 'interval' de la réponse JSON pour une prédiction"""
+    return {
+        'lower': lower,
+        'upper': upper,
+        'quantiles': list(INTERVAL_QUANTILES),
+        'level': INTERVAL_QUANTILES[1] - INTERVAL_QUANTILES[0],
+        'formatted': f'${lower:,.2f} - ${upper:,.2f}'
+    }
+
+
+def ensemble_disagreement(predictions, blended):
+    """Mesure le désaccord entre modèles (signal d'incertitude)"""
+    values = np.array([float(p[0]) for p in predictions.values()])
+    spread = float(values.max() - values.min())
+    price = float(blended[0])
+    
+    return {
+        'std': float(values.std()),
+        'range': spread,
+        'relative_range': spread / price if price else None
+    }
+
+
+# Copies des modèles réservées aux jobs, limitées en threads pour ne pas
+# concurrencer le trafic interactif
+JOBS_MODEL_THREADS = int(os.environ.get('JOBS_MODEL_THREADS', '1'))
+job_models = {}
+
+def get_job_model(model_name):
+    """Copie du modèle dédiée aux jobs (créée à la première utilisation)
+    
+    Les modèles de quantiles sont désignés par 'interval_lower' / 'interval_upper'.
+    """
+    if model_name not in job_models:
+        source = interval_models[model_name[len('interval_'):]] if model_name.startswith('interval_') else models[model_name]
+        job_model = copy.deepcopy(source)
+        if hasattr(job_model, 'set_params') and 'n_jobs' in job_model.get_params():
+            job_model.set_params(n_jobs=JOBS_MODEL_THREADS)
+        job_models[model_name] = job_model
+    return job_models[model_name]
+
+
+def score_chunk(chunk, model_name):
+    """Score un bloc de portefeuille en un seul appel vectorisé au modèle"""
+    chunk = fill_context_frame(chunk.copy())
+    errors, numeric = validate_frame(chunk)
+    valid = errors.isna().to_numpy()
+    
+    result = pd.DataFrame({'price': np.nan}, index=chunk.index)
+    if interval_models:
+        result['price_lower'] = np.nan
+        result['price_upper'] = np.nan
+    
+    if valid.any():
+        features = prepare_features_frame(numeric[valid])
+        prices = get_job_model(model_name).predict(features)
+        result.loc[valid, 'price'] = prices
+        if interval_models:
+            result.loc[valid, 'price_lower'] = np.minimum(get_job_model('interval_lower').predict(features), prices)
+            result.loc[valid, 'price_upper'] = np.maximum(get_job_model('interval_upper').predict(features), prices)
+        drift_monitor.observe_many(features.to_numpy(dtype=float), prices)
+    
+    result['error'] = errors
+    return result
+
+
+job_manager = JobManager(
+    score_chunk,
+    max_workers=int(os.environ.get('JOBS_WORKERS', '1')),
+    chunk_size=int(os.environ.get('JOBS_CHUNK_SIZE', '10000')),
+    max_jobs=int(os.environ.get('JOBS_MAX', '100')),
+    max_pending=int(os.environ.get('JOBS_MAX_PENDING', '10')),
+    result_ttl=int(os.environ.get('JOBS_RESULT_TTL', '3600'))
+)
+
+
+# Logique des routes principales, partagée avec le serveur asynchrone
+# (HouseApiAsync.py) : chaque fonction retourne (corps, code HTTP)
+
+def health_payload():
     """Endpoint de santé pour vérifier que l'API fonctionne"""
     models_status = {
         model_name: 'loaded' if model_name in models else 'not loaded'
         for model_name in ALLOWED_MODELS
     }
     
-    return jsonify({
+    return {
         'status': 'healthy',
         'models': models_status,
+        'interval_models': 'loaded' if interval_models else 'not loaded',
+        'coalescing': prediction_flight.stats(),
         'timestamp': datetime.now().isoformat()
-    }), 200
+    }, 200
 
 
-@app.route('/api/models', methods=['GET'])
-def get_models():
+def models_payload():
     """Liste les modèles disponibles"""
     available_models = []
     for model_name in ALLOWED_MODELS:
@@ -207,16 +571,15 @@ def get_models():
                 'status': 'available'
             })
     
-    return jsonify({
+    return {
         'models': available_models,
         'total': len(available_models)
-    }), 200
+    }, 200
 
 
-@app.route('/api/info', methods=['GET'])
-def get_info():
+def info_payload():
     """Informations sur les paramètres attendus"""
-    return jsonify({
+    return {
         'required_parameters': {
             'grade': {
                 'type': 'integer',
@@ -285,7 +648,8 @@ def get_info():
                 'type': 'float',
                 'range': '500-1000000',
                 'unit': 'sqft',
-                'description': 'Surface moyenne des 15 terrains voisins les plus proches'
+                'description': 'Surface moyenne des 15 terrains voisins les plus proches '
+                               '(déduite de lat/long si omise et si la table de voisinage est chargée)'
             },
             'condition': {
                 'type': 'integer',
@@ -301,55 +665,152 @@ def get_info():
         'optional_parameters': {
             'model': {
                 'type': 'string',
-                'values': ALLOWED_MODELS,
+                'values': ALLOWED_MODELS + [ENSEMBLE_MODEL],
                 'default': 'xgboost',
-                'description': 'Modèle à utiliser pour la prédiction'
+                'description': 'Modèle à utiliser pour la prédiction ("ensemble" = tous les modèles en parallèle)'
+            },
+            'tier': {
+                'type': 'string',
+                'values': list(INFERENCE_TIERS),
+                'default': DEFAULT_TIER,
+                'description': 'Compromis précision/latence : nombre d\'arbres XGBoost évalués (query ?tier= ou champ JSON)'
+            },
+            'weights': {
+                'type': 'object',
+                'default': ENSEMBLE_WEIGHTS,
+                'description': 'Poids du mélange en mode ensemble, par modèle (normalisés)'
+            },
+            'interval': {
+                'type': 'boolean',
+                'default': False,
+                'description': 'Ajoute l\'intervalle de prédiction des modèles de quantiles, au même tier (query ?interval=1 ou champ JSON)'
             }
         }
-    }), 200
+    }, 200
 
 
-@app.route('/api/predict', methods=['POST'])
-def predict():
-    """Endpoint principal de prédiction"""
+def compute_prediction(record, model_name, tier, weights, with_interval=False):
+    """Calcule prédiction, intervalle (sur demande) et détails d'ensemble pour un HouseRecord"""
+    features = record.to_frame()
+    
+    # Faire la prédiction
+    ensemble_details = None
+    if model_name == ENSEMBLE_MODEL:
+        predictions, blended, used_weights = predict_ensemble(features, weights, tier)
+        prediction = float(blended[0])
+        ensemble_details = {
+            'predictions': {
+                name: float(values[0]) for name, values in predictions.items()
+            },
+            'weights': used_weights,
+            'disagreement': ensemble_disagreement(predictions, blended)
+        }
+    else:
+        prediction = model_predict(model_name, features, tier)[0]
+    
+    lower = upper = None
+    if with_interval:
+        lower, upper = predict_interval(features, [prediction], tier)
+    
+    # Copie asynchrone vers le modèle shadow (non bloquante)
+    if shadow is not None:
+        shadow.submit(features, prediction, model_name)
+    
+    return prediction, lower, upper, ensemble_details
+
+
+def predict_payload(data, args):
+    """Logique de /api/predict, commune aux serveurs Flask et asynchrone
+    
+    `data` est le corps JSON décodé et `args` les paramètres de requête.
+    Retourne le corps de la réponse et le code HTTP.
+    """
     try:
-        # Récupérer les données JSON
-        data = request.get_json()
-        
         if not data:
-            return jsonify({
+            return {
                 'error': 'Aucune donnée fournie',
                 'message': 'Le corps de la requête doit contenir des données JSON'
-            }), 400
+            }, 400
+        
+        # Compléter les features de contexte à partir de la position
+        data, derived_fields = fill_context_features(data)
         
-        # Valider les données
-        is_valid, validation_message = validate_input(data)
+        # Convertir une seule fois puis valider les données
+        try:
+            record = HouseRecord.from_mapping(data)
+        except ValueError as e:
+            return {
+                'error': 'Validation échouée',
+                'message': str(e)
+            }, 400
+        
+        is_valid, validation_message = record.validate()
         if not is_valid:
-            return jsonify({
+            return {
                 'error': 'Validation échouée',
                 'message': validation_message
-            }), 400
+            }, 400
         
         # Sélectionner le modèle
         model_name = data.get('model', 'xgboost').lower()
-        if model_name not in ALLOWED_MODELS:
-            return jsonify({
+        if model_name not in ALLOWED_MODELS and model_name != ENSEMBLE_MODEL:
+            return {
                 'error': 'Modèle invalide',
-                'message': f'Modèle doit être l\'un de: {", ".join(ALLOWED_MODELS)}'
-            }), 400
+                'message': f'Modèle doit être l\'un de: {", ".join(ALLOWED_MODELS + [ENSEMBLE_MODEL])}'
+            }, 400
+        
+        weights = None
+        if model_name == ENSEMBLE_MODEL:
+            if not models:
+                return {
+                    'error': 'Modèle non disponible',
+                    'message': 'Aucun modèle n\'est chargé'
+                }, 503
+            
+            weights = data.get('weights')
+            if weights is not None:
+                is_valid, validation_message = validate_weights(weights)
+                if not is_valid:
+                    return {
+                        'error': 'Validation échouée',
+                        'message': validation_message
+                    }, 400
         
-        if model_name not in models:
-            return jsonify({
+        elif model_name not in models:
+            return {
                 'error': 'Modèle non disponible',
                 'message': f'Le modèle {model_name} n\'est pas chargé'
-            }), 503
+            }, 503
+        
+        # Niveau précision/latence (?tier=fast ou champ "tier")
+        tier = str(args.get('tier', data.get('tier', DEFAULT_TIER))).lower()
+        is_valid, validation_message = validate_tier(tier, model_name)
+        if not is_valid:
+            return {
+                'error': 'Tier invalide',
+                'message': validation_message
+            }, 400
+        
+        # Intervalle de prédiction sur demande (?interval=1 ou champ "interval")
+        with_interval = str(args.get('interval', data.get('interval', False))).lower() in ('1', 'true')
+        if with_interval and not interval_models:
+            return {
+                'error': 'Intervalle non disponible',
+                'message': 'Les modèles de quantiles ne sont pas chargés'
+            }, 503
+        
+        # Calcul partagé entre requêtes identiques simultanées
+        weights_key = tuple(sorted((name, float(value)) for name, value in weights.items())) if weights else None
+        prediction, lower, upper, ensemble_details = prediction_flight.do(
+            (model_name, tier, weights_key, with_interval, record.key()),
+            compute_prediction, record, model_name, tier, weights, with_interval
+        )
         
-        # Préparer les features
-        features = prepare_features(data)
+        # Mise à jour des résumés de dérive
+        drift_monitor.observe(record.values, prediction)
         
-        # Faire la prédiction
-        model = models[model_name]
-        prediction = model.predict(features)[0]
+        input_data = record.as_dict()
+        input_data['waterfront'] = bool(input_data['waterfront'])
         
         # Préparer la réponse
         response = {
@@ -360,33 +821,429 @@ def predict():
                 'formatted_price': f'${prediction:,.2f}'
             },
             'model_used': model_name,
-            'input_data': {
-                'grade': int(data['grade']),
-                'waterfront': bool(int(data['waterfront'])),
-                'sqft_living': float(data['sqft_living']),
-                'bathrooms': float(data['bathrooms']),
-                'lat': float(data['lat']),
-                'view': int(data['view']),
-                'long': float(data['long']),
-                'yr_built': int(data['yr_built']),
-                'zipcode': int(data['zipcode']),
-                'sqft_lot': float(data['sqft_lot']),
-                'sqft_basement': float(data['sqft_basement']),
-                'annee_construction': int(data['annee_construction']),
-                'sqft_lot15': float(data['sqft_lot15']),
-                'condition': int(data['condition']),
-                'yr_renovated': int(data['yr_renovated'])
-            },
+            'tier': tier,
+            'input_data': input_data,
             'timestamp': datetime.now().isoformat()
         }
         
-        return jsonify(response), 200
+        if lower is not None:
+            response['prediction']['interval'] = interval_details(float(lower[0]), float(upper[0]))
+        
+        if ensemble_details is not None:
+            response['ensemble'] = ensemble_details
+        
+        if derived_fields:
+            response['derived_fields'] = derived_fields
+        
+        return response, 200
+    
+    except Exception as e:
+        return {
+            'error': 'Erreur de prédiction',
+            'message': str(e)
+        }, 500
+
+
+# Profilage à la demande : en-tête X-Profile accompagné du jeton admin,
+# ou échantillonnage aléatoire d'une fraction des requêtes
+PROFILE_ADMIN_TOKEN = os.environ.get('PROFILE_ADMIN_TOKEN')
+PROFILE_SAMPLE_RATE = float(os.environ.get('PROFILE_SAMPLE_RATE', '0'))
+profile_store = ProfileStore(max_profiles=int(os.environ.get('PROFILE_MAX', '50')))
+
+
+def is_admin_request():
+    """Vérifie le jeton admin (X-Admin-Token)"""
+    return bool(PROFILE_ADMIN_TOKEN) and request.headers.get('X-Admin-Token') == PROFILE_ADMIN_TOKEN
+
+
+def should_profile():
+    if request.headers.get('X-Profile') and is_admin_request():
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+def profiled(view):
+    """Profile l'arbre d'appels de la vue quand le profilage est demandé"""
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        if not should_profile():
+            return view(*args, **kwargs)
+        
+        with RequestProfiler() as profiler:
+            result = view(*args, **kwargs)
+        
+        record = profile_store.add(profiler, request.path)
+        response = make_response(result)
+        response.headers['X-Profile-Id'] = record['id']
+        return response
+    
+    return wrapper
+
+
+@app.route('/')
+def home():
+    """Route d'accueil"""
+    return jsonify({
+        'message': 'API HomePricer - Prédiction de prix immobiliers',
+        'version': '1.0.0',
+        'endpoints': {
+            'health': '/health',
+            'predict': '/api/predict',
+            'models': '/api/models',
+            'info': '/api/info',
+            'shadow': '/api/shadow',
+            'jobs': '/api/jobs',
+            'bulk': '/api/predict/bulk',
+            'drift': '/api/drift',
+            'market': '/api/market/<zipcode>'
+        }
+    }), 200
+
+
+@app.route('/health')
+def health():
+    """Endpoint de santé pour vérifier que l'API fonctionne"""
+    body, status = health_payload()
+    return jsonify(body), status
+
+
+@app.route('/api/models', methods=['GET'])
+def get_models():
+    """Liste les modèles disponibles"""
+    body, status = models_payload()
+    return jsonify(body), status
+
+
+@app.route('/api/info', methods=['GET'])
+def get_info():
+    """Informations sur les paramètres attendus"""
+    body, status = info_payload()
+    return jsonify(body), status
+
+
+@app.route('/api/predict', methods=['POST'])
+@profiled
+def predict():
+    """Endpoint principal de prédiction"""
+    try:
+        # Récupérer les données JSON
+        data = request.get_json()
+    except Exception as e:
+        return jsonify({
+            'error': 'Erreur de prédiction',
+            'message': str(e)
+        }), 500
+    
+    body, status = predict_payload(data, request.args)
+    return jsonify(body), status
+
+
+@app.route('/api/predict/bulk', methods=['POST'])
+@profiled
+def predict_bulk():
+    """Scoring en masse à partir d'une matrice binaire (Arrow IPC ou float32 brut)
+    
+    Les colonnes suivent l'ordre de FEATURE_COLUMNS. Aucune validation par
+    ligne n'est faite : cet endpoint est réservé aux échanges entre serveurs.
+    """
+    content_type = request.mimetype
+    if content_type not in (RAW_FLOAT32_MIMETYPE, ARROW_STREAM_MIMETYPE):
+        return jsonify({
+            'error': 'Format non supporté',
+            'message': f'Content-Type doit être {RAW_FLOAT32_MIMETYPE} ou {ARROW_STREAM_MIMETYPE}'
+        }), 415
+    
+    if content_type == ARROW_STREAM_MIMETYPE and pa is None:
+        return jsonify({
+            'error': 'Format non disponible',
+            'message': 'pyarrow n\'est pas installé sur le serveur'
+        }), 415
+    
+    model_name = request.args.get('model', 'xgboost').lower()
+    if model_name not in ALLOWED_MODELS:
+        return jsonify({
+            'error': 'Modèle invalide',
+            'message': f'Modèle doit être l\'un de: {", ".join(ALLOWED_MODELS)}'
+        }), 400
+    
+    if model_name not in models:
+        return jsonify({
+            'error': 'Modèle non disponible',
+            'message': f'Le modèle {model_name} n\'est pas chargé'
+        }), 503
     
+    tier = request.args.get('tier', DEFAULT_TIER).lower()
+    is_valid, validation_message = validate_tier(tier, model_name)
+    if not is_valid:
+        return jsonify({
+            'error': 'Tier invalide',
+            'message': validation_message
+        }), 400
+    
+    try:
+        matrix = read_bulk_matrix(request.get_data(cache=False), content_type)
+    except Exception as e:
+        return jsonify({
+            'error': 'Matrice illisible',
+            'message': str(e)
+        }), 400
+    
+    with_interval = request.args.get('interval', '0').lower() in ('1', 'true')
+    if with_interval and not interval_models:
+        return jsonify({
+            'error': 'Intervalle non disponible',
+            'message': 'Les modèles de quantiles ne sont pas chargés'
+        }), 503
+    
+    try:
+        predictions = predict_matrix(model_name, matrix, tier)
+        lower = upper = None
+        if with_interval:
+            lower, upper = predict_interval(matrix, predictions, tier)
+        drift_monitor.observe_many(matrix, predictions)
     except Exception as e:
         return jsonify({
             'error': 'Erreur de prédiction',
             'message': str(e)
         }), 500
+    
+    return Response(
+        write_bulk_predictions(predictions, content_type, lower, upper),
+        mimetype=content_type,
+        headers={
+            'X-Model-Used': model_name,
+            'X-Tier': tier,
+            'X-Row-Count': str(len(matrix))
+        }
+    ), 200
+
+
+@app.route('/api/market/<int:zipcode>', methods=['GET'])
+def get_market(zipcode):
+    """Statistiques de marché d'un code postal (prix médian, prix/sqft, volume, tendance)"""
+    if market_stats is None:
+        return jsonify({
+            'error': 'Statistiques non disponibles',
+            'message': 'La table des statistiques de marché n\'est pas chargée'
+        }), 503
+    
+    stats = market_stats.lookup(zipcode)
+    if stats is None:
+        return jsonify({
+            'error': 'Code postal inconnu',
+            'message': f'Aucune statistique de marché pour le code postal {zipcode}'
+        }), 404
+    
+    return jsonify({
+        'zipcode': zipcode,
+        'currency': 'USD',
+        **stats
+    }), 200
+
+
+@app.route('/api/drift', methods=['GET'])
+def get_drift():
+    """Résumés des entrées et des prix prédits, avec la distance à la référence"""
+    return jsonify(drift_monitor.summary()), 200
+
+
+@app.route('/api/shadow', methods=['GET'])
+def get_shadow():
+    """Statistiques de l'évaluation du modèle shadow"""
+    if shadow is None:
+        return jsonify({
+            'error': 'Aucun modèle shadow',
+            'message': 'Définissez SHADOW_MODEL_PATH pour enregistrer un modèle shadow'
+        }), 404
+    
+    return jsonify(shadow.summary()), 200
+
+
+@app.route('/api/jobs', methods=['POST'])
+def submit_job():
+    """Soumet un portefeuille (fichier CSV ou liste JSON) à valoriser en arrière-plan"""
+    try:
+        if 'file' in request.files:
+            frame = pd.read_csv(request.files['file'])
+            model_name = request.form.get('model', 'xgboost').lower()
+        else:
+            data = request.get_json(silent=True) or {}
+            houses = data.get('houses')
+            if not isinstance(houses, list):
+                return jsonify({
+                    'error': 'Aucune donnée fournie',
+                    'message': 'Envoyez un fichier CSV (champ "file") ou un JSON {"houses": [...]}'
+                }), 400
+            frame = pd.DataFrame(houses)
+            model_name = str(data.get('model', 'xgboost')).lower()
+    except Exception as e:
+        return jsonify({
+            'error': 'Portefeuille illisible',
+            'message': str(e)
+        }), 400
+    
+    if frame.empty:
+        return jsonify({
+            'error': 'Aucune donnée fournie',
+            'message': 'Le portefeuille ne contient aucune maison'
+        }), 400
+    
+    if model_name not in ALLOWED_MODELS:
+        return jsonify({
+            'error': 'Modèle invalide',
+            'message': f'Modèle doit être l\'un de: {", ".join(ALLOWED_MODELS)}'
+        }), 400
+    
+    if model_name not in models:
+        return jsonify({
+            'error': 'Modèle non disponible',
+            'message': f'Le modèle {model_name} n\'est pas chargé'
+        }), 503
+    
+    try:
+        job = job_manager.submit(frame, model_name)
+    except JobQueueFull as e:
+        return jsonify({
+            'error': 'File de jobs pleine',
+            'message': f'{e}. Réessayez plus tard.'
+        }), 429
+    
+    response = job.to_dict()
+    response['status_url'] = f'/api/jobs/{job.id}'
+    response['result_url'] = f'/api/jobs/{job.id}/result'
+    return jsonify(response), 202
+
+
+@app.route('/api/jobs', methods=['GET'])
+def list_jobs():
+    """Liste les jobs connus"""
+    jobs = [job.to_dict() for job in job_manager.list()]
+    return jsonify({
+        'jobs': jobs,
+        'total': len(jobs)
+    }), 200
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """État et progression d'un job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'error': 'Job introuvable',
+            'message': f'Aucun job avec l\'identifiant {job_id}'
+        }), 404
+    
+    return jsonify(job.to_dict()), 200
+
+
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """Supprime un job terminé et libère ses résultats"""
+    try:
+        job = job_manager.delete(job_id)
+    except ValueError as e:
+        return jsonify({
+            'error': 'Job non terminé',
+            'message': str(e)
+        }), 409
+    
+    if job is None:
+        return jsonify({
+            'error': 'Job introuvable',
+            'message': f'Aucun job avec l\'identifiant {job_id}'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'job_id': job.id
+    }), 200
+
+
+@app.route('/api/jobs/<job_id>/result', methods=['GET'])
+def get_job_result(job_id):
+    """Télécharge les résultats d'un job terminé au format CSV"""
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({
+            'error': 'Job introuvable',
+            'message': f'Aucun job avec l\'identifiant {job_id}'
+        }), 404
+    
+    if job.status != 'done':
+        return jsonify({
+            'error': 'Job non terminé',
+            'message': f'Le job est à l\'état {job.status}',
+            'job': job.to_dict()
+        }), 409
+    
+    buffer = io.StringIO()
+    job.result.to_csv(buffer, index=False)
+    return Response(
+        buffer.getvalue(),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename=job_{job.id}.csv'}
+    ), 200
+
+
+@app.route('/api/admin/profiles', methods=['GET'])
+def list_profiles():
+    """Liste les profils de requêtes enregistrés"""
+    if not is_admin_request():
+        return jsonify({
+            'error': 'Accès refusé',
+            'message': 'Jeton admin (X-Admin-Token) manquant ou invalide'
+        }), 403
+    
+    profiles = profile_store.list()
+    return jsonify({
+        'profiles': profiles,
+        'total': len(profiles)
+    }), 200
+
+
+@app.route('/api/admin/profiles/<profile_id>', methods=['GET'])
+def download_profile(profile_id):
+    """Télécharge un profil en piles repliées (format=collapsed) ou pstats (format=pstats)"""
+    if not is_admin_request():
+        return jsonify({
+            'error': 'Accès refusé',
+            'message': 'Jeton admin (X-Admin-Token) manquant ou invalide'
+        }), 403
+    
+    record = profile_store.get(profile_id)
+    if record is None:
+        return jsonify({
+            'error': 'Profil introuvable',
+            'message': f'Aucun profil avec l\'identifiant {profile_id}'
+        }), 404
+    
+    output_format = request.args.get('format', 'collapsed')
+    clock = request.args.get('clock', 'wall')
+    if clock not in CLOCKS:
+        return jsonify({
+            'error': 'Horloge invalide',
+            'message': f'clock doit être l\'un de: {", ".join(CLOCKS)}'
+        }), 400
+    
+    profiler = record['profiler']
+    if output_format == 'collapsed':
+        return Response(
+            profiler.collapsed_text(clock),
+            mimetype='text/plain',
+            headers={'Content-Disposition': f'attachment; filename=profile_{profile_id}_{clock}.folded'}
+        ), 200
+    if output_format == 'pstats':
+        return Response(
+            profiler.pstats_bytes(clock),
+            mimetype='application/octet-stream',
+            headers={'Content-Disposition': f'attachment; filename=profile_{profile_id}_{clock}.pstats'}
+        ), 200
+    
+    return jsonify({
+        'error': 'Format invalide',
+        'message': 'format doit être collapsed ou pstats'
+    }), 400
 
 
 @app.errorhandler(404)
@@ -0,0 +1,169 @@
+"""Mode de service asynchrone (ASGI) de l'API HomePricer
+
+Expose les mêmes routes que HouseApi.py (/api/predict, /api/models, /health,
+/api/info) avec des contrats de requête et de réponse identiques : la logique
+est partagée via les fonctions *_payload de HouseApi. Les connexions sont
+gérées par la boucle asyncio ; l'inférence (CPU) s'exécute dans un pool de
+threads borné, si bien qu'un client lent n'immobilise plus de worker.
+
+    uvicorn HouseApiAsync:app --host 0.0.0.0 --port 8000
+    python HouseApiAsync.py
+"""
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.responses import Response
+from starlette.routing import Route
+
+from singleflight import AsyncSingleFlight
+from HouseApi import (
+    ALLOWED_MODELS,
+    health_payload,
+    info_payload,
+    models,
+    models_payload,
+    predict_payload
+)
+
+# Threads d'inférence et nombre maximal de requêtes en cours de traitement ;
+# au-delà, les requêtes attendent (sans thread) qu'une place se libère
+INFERENCE_WORKERS = int(os.environ.get('ASYNC_INFERENCE_WORKERS', str(os.cpu_count() or 4)))
+MAX_PENDING = int(os.environ.get('ASYNC_MAX_PENDING', str(INFERENCE_WORKERS * 4)))
+
+inference_executor = ThreadPoolExecutor(
+    max_workers=INFERENCE_WORKERS,
+    thread_name_prefix='inference'
+)
+_pending = None
+
+# Les requêtes identiques simultanées attendent le même calcul sans occuper
+# de thread d'inférence
+predict_flight = AsyncSingleFlight()
+
+
+class JSONResponse(Response):
+    """Sérialisation JSON identique à celle de jsonify (clés triées, ASCII, compacte)"""
+    media_type = 'application/json'
+
+    def render(self, content):
+        body = json.dumps(content, ensure_ascii=True, sort_keys=True, separators=(',', ':'))
+        return f'{body}\n'.encode('utf-8')
+
+
+async def run_inference(func, *args):
+    """Exécute une fonction CPU dans le pool borné"""
+    global _pending
+    if _pending is None:
+        _pending = asyncio.Semaphore(MAX_PENDING)
+
+    async with _pending:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(inference_executor, func, *args)
+
+
+async def health(request):
+    """Endpoint de santé pour vérifier que l'API fonctionne
+    
+    En mode asynchrone, la coalescence a lieu à deux niveaux : sur la requête
+    brute (predict_flight) puis sur la prédiction (flight partagé avec Flask).
+    Les totaux additionnent les appels coalescés des deux niveaux.
+    """
+    body, status = health_payload()
+    prediction_stats = body['coalescing']
+    request_stats = predict_flight.stats()
+    body['coalescing'] = {
+        'executed': prediction_stats['executed'],
+        'coalesced': request_stats['coalesced'] + prediction_stats['coalesced'],
+        'in_flight': request_stats['in_flight'],
+        'layers': {
+            'request': request_stats,
+            'prediction': prediction_stats
+        }
+    }
+    return JSONResponse(body, status_code=status)
+
+
+async def get_models(request):
+    """Liste les modèles disponibles"""
+    body, status = models_payload()
+    return JSONResponse(body, status_code=status)
+
+
+async def get_info(request):
+    """Informations sur les paramètres attendus"""
+    body, status = info_payload()
+    return JSONResponse(body, status_code=status)
+
+
+async def predict(request):
+    """Endpoint principal de prédiction"""
+    try:
+        # Récupérer les données JSON
+        data = await request.json()
+    except Exception as e:
+        return JSONResponse({
+            'error': 'Erreur de prédiction',
+            'message': str(e)
+        }, status_code=500)
+
+    params = dict(request.query_params)
+    key = (json.dumps(data, sort_keys=True), tuple(sorted(params.items())))
+    body, status = await predict_flight.do(key, run_inference, predict_payload, data, params)
+    return JSONResponse(body, status_code=status)
+
+
+async def not_found(request, exc):
+    """Gestion des erreurs 404"""
+    return JSONResponse({
+        'error': 'Route non trouvée',
+        'message': 'L\'endpoint demandé n\'existe pas'
+    }, status_code=404)
+
+
+async def internal_error(request, exc):
+    """Gestion des erreurs 500"""
+    return JSONResponse({
+        'error': 'Erreur interne du serveur',
+        'message': 'Une erreur s\'est produite lors du traitement de votre requête'
+    }, status_code=500)
+
+
+app = Starlette(
+    routes=[
+        Route('/health', health),
+        Route('/api/models', get_models, methods=['GET']),
+        Route('/api/info', get_info, methods=['GET']),
+        Route('/api/predict', predict, methods=['POST'])
+    ],
+    middleware=[
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*'])
+    ],
+    exception_handlers={
+        404: not_found,
+        500: internal_error
+    }
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("\n" + "="*50)
+    print("Démarrage de l'API HomePricer (mode asynchrone)")
+    print("="*50)
+    print(f"Modèles disponibles: {', '.join([m for m in ALLOWED_MODELS if m in models])}")
+    print(f"Workers d'inférence: {INFERENCE_WORKERS}, requêtes en cours max: {MAX_PENDING}")
+    print("="*50 + "\n")
+
+    uvicorn.run(
+        app,
+        host='0.0.0.0',
+        port=int(os.environ.get('PORT', '8000')),
+        timeout_keep_alive=int(os.environ.get('ASYNC_KEEP_ALIVE', '30')),
+        backlog=4096
+    )
@@ -5,8 +5,15 @@ import folium
 from streamlit_folium import st_folium
 import xgboost as xgb
 import pickle
+import time
 from pathlib import Path
 
+from neighbourhood import load_neighbourhood_table
+from market import load_market_stats
+from zipcodes import estimate_zipcode_by_proximity, estimate_zipcodes_by_proximity
+from house_record import FEATURE_COLUMNS, HouseRecord
+from intervals import INTERVAL_MODEL_PATHS, INTERVAL_QUANTILES
+
 # Configuration de la page
 st.set_page_config(
     page_title="HomePricer",
@@ -36,7 +43,50 @@ def load_model():
         st.error(f"Erreur lors du chargement du modèle : {e}")
         return None
 
+# Modèles de quantiles compagnons (mêmes chemins et quantiles que l'API)
+@st.cache_resource
+def load_interval_models():
+    try:
+        return {bound: pickle.load(open(path, 'rb')) for bound, path in INTERVAL_MODEL_PATHS.items()}
+    except Exception:
+        return None
+
+# Nombre maximal de biens comparés affichés sur la carte
+MAX_COMPARISON_MARKERS = 500
+
+# Délai d'anti-rebond du mode live (secondes)
+LIVE_DEBOUNCE_S = 0.4
+
+# Prédiction mémorisée par tuple d'entrées (HouseRecord.key()).
+# Retourne (prix, borne basse, borne haute) ; bornes à None sans modèles de quantiles
+@st.cache_data(max_entries=1024, show_spinner=False)
+def predict_price(features_key):
+    model = load_model()
+    features_df = HouseRecord.from_key(features_key).to_frame()
+    prediction = float(model.predict(features_df)[0])
+    
+    interval_models = load_interval_models()
+    if interval_models is None:
+        return prediction, None, None
+    
+    # Même DataFrame de features pour les trois modèles
+    lower = min(float(interval_models['lower'].predict(features_df)[0]), prediction)
+    upper = max(float(interval_models['upper'].predict(features_df)[0]), prediction)
+    return prediction, lower, upper
+
+# Table précalculée des agrégats de voisinage (sqft_lot15 à partir de lat/long)
+@st.cache_resource
+def get_neighbourhood_table():
+    return load_neighbourhood_table()
+
+# Statistiques de marché par code postal (précalculées hors ligne)
+@st.cache_resource
+def get_market_stats():
+    return load_market_stats()
+
 # Fonction pour obtenir le code postal à partir des coordonnées GPS
+# (st.cache_data verrouille chaque clé pendant le calcul : les clics simultanés
+# sur les mêmes coordonnées partagent déjà une seule requête réseau)
 @st.cache_data
 def get_zipcode_from_coordinates(lat, lon):
     """
@@ -85,101 +135,6 @@ def get_zipcode_from_coordinates(lat, lon):
     
     return None
 
-def estimate_zipcode_by_proximity(lat, lon):
-    """
-    Estime le code postal basé sur la proximité avec des codes postaux connus de King County, WA
-    """
-    # Dictionnaire des codes postaux de King County (Seattle area) avec leurs coordonnées approximatives
-    king_county_zipcodes = {
-        98001: (47.3073, -122.2290),  # Auburn
-        98002: (47.2879, -122.2351),  # Auburn
-        98003: (47.3087, -122.3426),  # Federal Way
-        98004: (47.6229, -122.2043),  # Bellevue
-        98005: (47.6168, -122.1460),  # Bellevue
-        98006: (47.5632, -122.1493),  # Bellevue
-        98007: (47.6068, -122.1315),  # Bellevue
-        98008: (47.6168, -122.1196),  # Bellevue
-        98010: (47.2929, -121.9726),  # Black Diamond
-        98011: (47.7523, -122.2054),  # Bothell
-        98014: (47.6473, -121.7868),  # Carnation
-        98019: (47.7301, -122.2054),  # Duvall
-        98022: (47.4262, -121.7826),  # Enumclaw
-        98023: (47.3101, -122.3493),  # Federal Way
-        98024: (47.5373, -121.8232),  # Fall City
-        98027: (47.5262, -122.0326),  # Issaquah
-        98028: (47.7540, -122.2290),  # Kenmore
-        98029: (47.5262, -122.0326),  # Issaquah
-        98030: (47.3837, -122.2176),  # Kent
-        98031: (47.3887, -122.2343),  # Kent
-        98032: (47.3698, -122.2562),  # Kent
-        98033: (47.6779, -122.1910),  # Kirkland
-        98034: (47.7176, -122.1910),  # Kirkland
-        98038: (47.3632, -122.0690),  # Maple Valley
-        98039: (47.6351, -122.2290),  # Medina
-        98040: (47.5718, -122.2176),  # Mercer Island
-        98042: (47.3651, -122.1193),  # Kent
-        98045: (47.4826, -121.7493),  # North Bend
-        98047: (47.2729, -122.3493),  # Pacific
-        98052: (47.6779, -122.1212),  # Redmond
-        98053: (47.6707, -122.0426),  # Redmond
-        98055: (47.4512, -122.2093),  # Renton
-        98056: (47.4873, -122.1910),  # Renton
-        98057: (47.4762, -122.2176),  # Renton
-        98058: (47.4401, -122.1426),  # Renton
-        98059: (47.4873, -122.1193),  # Renton
-        98065: (47.5651, -121.9893),  # Snoqualmie
-        98070: (47.3837, -122.3176),  # Vashon
-        98074: (47.6262, -122.0326),  # Sammamish
-        98075: (47.5762, -122.0326),  # Sammamish
-        98077: (47.7540, -122.0643),  # Woodinville
-        98092: (47.2929, -122.2176),  # Auburn
-        98101: (47.6101, -122.3426),  # Seattle
-        98102: (47.6301, -122.3243),  # Seattle
-        98103: (47.6779, -122.3426),  # Seattle
-        98104: (47.6034, -122.3293),  # Seattle
-        98105: (47.6629, -122.3043),  # Seattle
-        98106: (47.5318, -122.3543),  # Seattle
-        98107: (47.6668, -122.3793),  # Seattle
-        98108: (47.5429, -122.3143),  # Seattle
-        98109: (47.6379, -122.3476),  # Seattle
-        98112: (47.6318, -122.2993),  # Seattle
-        98115: (47.6818, -122.3043),  # Seattle
-        98116: (47.5718, -122.3943),  # Seattle
-        98117: (47.6868, -122.3793),  # Seattle
-        98118: (47.5429, -122.2793),  # Seattle
-        98119: (47.6379, -122.3743),  # Seattle
-        98122: (47.6101, -122.3026),  # Seattle
-        98125: (47.7176, -122.3043),  # Seattle
-        98126: (47.5429, -122.3743),  # Seattle
-        98133: (47.7351, -122.3426),  # Seattle
-        98134: (47.5762, -122.3326),  # Seattle
-        98136: (47.5429, -122.3943),  # Seattle
-        98144: (47.5818, -122.3043),  # Seattle
-        98146: (47.5040, -122.3543),  # Seattle
-        98148: (47.4401, -122.3326),  # Burien
-        98155: (47.7540, -122.3043),  # Seattle
-        98166: (47.4540, -122.3543),  # Burien
-        98168: (47.4929, -122.3043),  # Burien
-        98177: (47.7540, -122.3743),  # Seattle
-        98178: (47.4929, -122.2626),  # Seattle
-        98188: (47.4540, -122.2926),  # SeaTac
-        98198: (47.4079, -122.3326),  # Des Moines
-        98199: (47.6379, -122.3993),  # Seattle
-    }
-    
-    # Calculer la distance avec chaque code postal et retourner le plus proche
-    min_distance = float('inf')
-    closest_zipcode = 98001
-    
-    for zipcode, (zip_lat, zip_lon) in king_county_zipcodes.items():
-        # Distance euclidienne simple
-        distance = ((lat - zip_lat) ** 2 + (lon - zip_lon) ** 2) ** 0.5
-        if distance < min_distance:
-            min_distance = distance
-            closest_zipcode = zipcode
-    
-    return closest_zipcode
-
 # Header
 st.markdown("""
     <div class="header">
@@ -253,6 +208,21 @@ folium.Marker(
     icon=folium.Icon(color='red', icon='home')
 ).add_to(m)
 
+# Marqueurs des biens comparés (mode multi-propriétés)
+comparison = st.session_state.get('comparison')
+if comparison is not None:
+    for row in comparison.dropna(subset=['price']).head(MAX_COMPARISON_MARKERS).itertuples():
+        folium.CircleMarker(
+            [row.lat, row.long],
+            radius=7,
+            color='#2563EB',
+            fill=True,
+            fillColor='#2563EB',
+            fillOpacity=0.7,
+            tooltip=f"{getattr(row, 'label', row.Index)} : ${row.price:,.0f}",
+            popup=f"Prix estimé : ${row.price:,.0f}<br>Code postal : {row.zipcode}"
+        ).add_to(m)
+
 # Ajout d'un cercle de rayon
 folium.Circle(
     location=[st.session_state.latitude, st.session_state.longitude],
@@ -304,280 +274,444 @@ st.markdown(f"""
 # Séparateur
 st.markdown("<br>", unsafe_allow_html=True)
 
-# Section Formulaire 
-st.markdown("""
-    <div class="params-header">
-        <div class="params-icon">⚙️</div>
-        <div>
-            <div class="params-title">Caracteristiques de la maison</div>
-            <div class="params-subtitle">Remplissez les informations pour obtenir une estimation</div>
+# Rendu du panneau de résultat
+def render_result(prediction, record, grade_category, lower=None, upper=None):
+    sqft_living = record['sqft_living']
+    grade = record['grade']
+    yr_built = record['yr_built']
+    yr_renovated = record['yr_renovated']
+    zipcode = record['zipcode']
+    
+    # Affichage du résultat
+    st.markdown(f"""
+        <div class="prediction-result">
+            <div class="result-icon">💰</div>
+            <div>
+                <div class="result-label">Estimation du prix</div>
+                <div class="result-value">${prediction:,.2f}</div>
+                <div class="result-confidence">Modèle: XGBoost</div>
+            </div>
         </div>
-    </div>
-""", unsafe_allow_html=True)
-
-# Section GPS
-st.markdown('<div class="section-divider"><span class="section-icon"></span> Localisation GPS</div>', unsafe_allow_html=True)
-
-# Option pour activer/désactiver la mise à jour automatique du code postal
-col_toggle = st.columns([3, 1])[1]
-with col_toggle:
-    st.session_state.auto_update_zipcode = st.checkbox(
-        "Auto ZIP",
-        value=st.session_state.auto_update_zipcode,
-        help="Mettre à jour automatiquement le code postal basé sur les coordonnées GPS"
+    """, unsafe_allow_html=True)
+    
+    # Calcul du prix au sqft
+    price_per_sqft = prediction / sqft_living
+    interval_line = (
+        f"• Fourchette estimée (quantiles {INTERVAL_QUANTILES[0]:.0%} - {INTERVAL_QUANTILES[1]:.0%}): ${lower:,.2f} - ${upper:,.2f}<br>"
+        if lower is not None else ""
     )
+    
+    # Informations complémentaires
+    st.markdown(f"""
+        <div class="info-box">
+            <strong>ℹ Informations complémentaires:</strong><br>
+            • Prix au pied carré: ${price_per_sqft:,.2f}/sqft<br>
+            {interval_line}
+            • Surface habitable: {sqft_living:,.0f} sqft ({sqft_living * 0.092903:.1f} m²)<br>
+            • Grade de qualité: {grade}/14 ({grade_category})<br>
+            • Année de construction: {yr_built} {f'(rénové en {yr_renovated})' if yr_renovated > 0 else ''}
+        </div>
+    """, unsafe_allow_html=True)
+    
+    # Comparaison avec le marché du code postal
+    market_stats = get_market_stats()
+    market = market_stats.lookup(zipcode) if market_stats is not None else None
+    
+    col_info1, col_info2, col_info3 = st.columns(3)
+    with col_info1:
+        st.metric(
+            label="Prix estimé",
+            value=f"${prediction:,.0f}",
+            delta=f"{prediction / market['median_price'] - 1:+.1%} vs médiane {zipcode}" if market else None
+        )
+    with col_info2:
+        st.metric(
+            label="Prix/sqft",
+            value=f"${price_per_sqft:.2f}",
+            delta=f"{price_per_sqft / market['median_price_per_sqft'] - 1:+.1%} vs marché" if market else f"Grade {grade}"
+        )
+    with col_info3:
+        if market:
+            st.metric(
+                label=f"Marché {zipcode}",
+                value=f"${market['median_price']:,.0f}",
+                delta=f"{market['trend']:+.1%} tendance" if market['trend'] is not None else None,
+                help=f"Prix médian, {market['volume']} ventes, ${market['median_price_per_sqft']:,.0f}/sqft"
+            )
+            st.caption(f"{market['volume']} ventes • ${market['median_price_per_sqft']:,.0f}/sqft médian")
+        else:
+            st.caption("Statistiques de marché indisponibles pour ce code postal")
+
+
+# Formulaire et résultat isolés dans un fragment : modifier un champ ne
+# relance que ce bloc, pas la carte ni le reste de la page
+@st.fragment
+def house_form():
+    # Section Formulaire 
+    st.markdown("""
+        <div class="params-header">
+            <div class="params-icon">⚙️</div>
+            <div>
+                <div class="params-title">Caracteristiques de la maison</div>
+                <div class="params-subtitle">Remplissez les informations pour obtenir une estimation</div>
+            </div>
+        </div>
+    """, unsafe_allow_html=True)
+
+    # Section GPS
+    st.markdown('<div class="section-divider"><span class="section-icon"></span> Localisation GPS</div>', unsafe_allow_html=True)
+
+    # Option pour activer/désactiver la mise à jour automatique du code postal
+    col_toggle = st.columns([3, 1])[1]
+    with col_toggle:
+        st.session_state.auto_update_zipcode = st.checkbox(
+            "Auto ZIP",
+            value=st.session_state.auto_update_zipcode,
+            help="Mettre à jour automatiquement le code postal basé sur les coordonnées GPS"
+        )
+
+    gps_col1, gps_col2, gps_col3 = st.columns([1, 1, 1])
+    with gps_col1:
+        lat = st.number_input(
+            "Latitude",
+            value=st.session_state.latitude,
+            format="%.6f",
+            key="lat_input",
+            help="Coordonnée de latitude"
+        )
+    with gps_col2:
+        long = st.number_input(
+            "Longitude",
+            value=st.session_state.longitude,
+            format="%.6f",
+            key="lon_input",
+            help="Coordonnée de longitude"
+        )
+    with gps_col3:
+        zipcode = st.number_input(
+            "Code Postal (Zipcode)",
+            min_value=10000,
+            max_value=99999,
+            value=st.session_state.zipcode,
+            step=1,
+            help="Code postal de la propriété",
+            key="zipcode_input"
+        )
+
+
+    # Section Surfaces
+    st.markdown('<div class="section-divider"><span class="section-icon"></span> Surfaces et dimensions</div>', unsafe_allow_html=True)
+
+    surf_col1, surf_col2, surf_col3, surf_col4 = st.columns([1, 1, 1, 1])
+    with surf_col1:
+        sqft_living = st.number_input(
+            "Surface habitable (sqft)",
+            min_value=300,
+            max_value=13000,
+            value=2000,
+            step=50,
+            help="Surface habitable en pieds carrés"
+        )
+    with surf_col2:
+        sqft_lot = st.number_input(
+            "Surface terrain (sqft)",
+            min_value=500,
+            max_value=1500000,
+            value=5000,
+            step=100,
+            help="Surface totale du terrain"
+        )
+    with surf_col3:
+        sqft_basement = st.number_input(
+            "Surface sous-sol (sqft)",
+            min_value=0,
+            max_value=5000,
+            value=0,
+            step=50,
+            help="Surface du sous-sol (0 si aucun)"
+        )
+    with surf_col4:
+        # Valeur par défaut déduite du voisinage de la position sélectionnée
+        neighbourhood_table = get_neighbourhood_table()
+        context = neighbourhood_table.lookup(lat, long) if neighbourhood_table is not None else None
+        sqft_lot15_default = int(min(max(round(context['sqft_lot15']), 500), 1500000)) if context else 5000
+    
+        sqft_lot15 = st.number_input(
+            "Surface moyenne terrain voisins (sqft)",
+            min_value=500,
+            max_value=1500000,
+            value=sqft_lot15_default,
+            step=100,
+            help="Moyenne des surfaces des 15 plus proches voisins"
+        )
+        if context:
+            st.caption("Valeur estimée à partir du voisinage")
+
+    # Section Pièces
+    st.markdown('<div class="section-divider"><span class="section-icon"></span> Pièces et aménagements</div>', unsafe_allow_html=True)
+
+    pieces_col1, pieces_col2, pieces_col3, pieces_col4 = st.columns([1, 1, 1, 1])
+    with pieces_col1:
+        bathrooms = st.number_input(
+            "Nombre salles de bain",
+            min_value=0.5,
+            max_value=8.0,
+            value=2.0,
+            step=0.25,
+            help="Nombre de salles de bain (0.5 = toilettes)"
+        )
+    with pieces_col2:
+        waterfront = st.selectbox(
+            "Vue sur l'eau",
+            options=[0, 1],
+            format_func=lambda x: "Oui" if x == 1 else "Non",
+            help="Propriété avec vue sur l'eau"
+        )
+    with pieces_col3:
+        view = st.selectbox(
+            "Qualité de la vue",
+            options=[0, 1, 2, 3, 4],
+            format_func=lambda x: ["Aucune", "Moyenne", "Bonne", "Excellente", "Exceptionnelle"][x],
+            help="Qualité de la vue (0-4)"
+        )
+    with pieces_col4:
+        condition = st.selectbox(
+            "État du bien",
+            options=[1, 2, 3, 4, 5],
+            index=2,
+            format_func=lambda x: ["Très mauvais", "Mauvais", "Moyen", "Bon", "Très bon"][x-1],
+            help="État général de la propriété (1-5)"
+        )
+
+    # Section Qualité
+    st.markdown('<div class="section-divider"><span class="section-icon"></span> Qualité et construction</div>', unsafe_allow_html=True)
+
+    qual_col1, qual_col2, qual_col3 = st.columns([1, 1, 1])
+    with qual_col1:
+        grade = st.number_input(
+            "Grade de construction",
+            min_value=1,
+            max_value=14,
+            value=7,
+            step=1,
+            help="Qualité de construction et design (1-14)"
+        )
+        # Afficher la catégorie basée sur le grade
+        if grade <= 4:
+            grade_category = "Basique"
+        elif grade <= 7:
+            grade_category = "Standard"
+        elif grade <= 10:
+            grade_category = "Haut gamme"
+        else:
+            grade_category = "Luxe"
+        st.caption(f"Catégorie: {grade_category}")
+    
+    with qual_col2:
+        from datetime import datetime
+        current_year = datetime.now().year
+    
+        yr_built = st.number_input(
+            "Année construction",
+            min_value=1000,
+            max_value=current_year,
+            value=1990,
+            step=1,
+            help="Année de construction initiale"
+        )
+    with qual_col3:
+        # L'année de rénovation doit être >= année de construction et <= année en cours
+        min_yr_renovated = yr_built if yr_built > 0 else 0
+    
+        yr_renovated = st.number_input(
+            "Année rénovation",
+            min_value=0,
+            max_value=current_year,
+            value=0,
+            step=1,
+            help=f"Année de dernière rénovation (0 si jamais rénové, min: {min_yr_renovated if min_yr_renovated > 0 else 'N/A'})"
+        )
+    
+        # Validation : vérifier que l'année de rénovation n'est pas inférieure à l'année de construction
+        if yr_renovated > 0 and yr_renovated < yr_built:
+            st.warning(f" L'année de rénovation ({yr_renovated}) ne peut pas être inférieure à l'année de construction ({yr_built})")
 
-gps_col1, gps_col2, gps_col3 = st.columns([1, 1, 1])
-with gps_col1:
-    lat = st.number_input(
-        "Latitude",
-        value=st.session_state.latitude,
-        format="%.6f",
-        key="lat_input",
-        help="Coordonnée de latitude"
-    )
-with gps_col2:
-    long = st.number_input(
-        "Longitude",
-        value=st.session_state.longitude,
-        format="%.6f",
-        key="lon_input",
-        help="Coordonnée de longitude"
-    )
-with gps_col3:
-    zipcode = st.number_input(
-        "Code Postal (Zipcode)",
-        min_value=10000,
-        max_value=99999,
-        value=st.session_state.zipcode,
-        step=1,
-        help="Code postal de la propriété",
-        key="zipcode_input"
+    # Note : annee_construction sera égale à yr_built
+    annee_construction = yr_built
+    
+    # Préparation des données pour la prédiction : conversion unique vers le
+    # même enregistrement (et le même ordre de features) que l'API
+    record = HouseRecord.from_mapping({
+        'grade': grade,
+        'waterfront': waterfront,
+        'sqft_living': sqft_living,
+        'bathrooms': bathrooms,
+        'lat': lat,
+        'view': view,
+        'long': long,
+        'yr_built': yr_built,
+        'zipcode': zipcode,
+        'sqft_lot': sqft_lot,
+        'sqft_basement': sqft_basement,
+        'annee_construction': annee_construction,
+        'sqft_lot15': sqft_lot15,
+        'condition': condition,
+        'yr_renovated': yr_renovated
+    })
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+    
+    live_mode = st.toggle(
+        "Mode live",
+        key="live_mode",
+        help="Recalculer le prix automatiquement à chaque modification"
     )
+    
+    if live_mode:
+        features_key = record.key()
+        
+        # Anti-rebond : on attend que la saisie se stabilise. Si un autre champ
+        # change pendant l'attente, Streamlit interrompt cette exécution et
+        # relance le fragment avec les nouvelles valeurs.
+        if st.session_state.get('live_features') != features_key:
+            time.sleep(LIVE_DEBOUNCE_S)
+            st.session_state.live_features = features_key
+        
+        if load_model() is None:
+            st.error(" Impossible de charger le modèle. Veuillez vérifier que le fichier 'xgb_house_price_model.pkl' existe.")
+            return
+        
+        try:
+            prediction, lower, upper = predict_price(features_key)
+            render_result(prediction, record, grade_category, lower, upper)
+        except Exception as e:
+            st.error(f" Erreur lors de la prédiction : {str(e)}")
+        return
+    
+    # Bouton de prédiction
+    if st.button("calculer le prix", use_container_width=True, type="primary"):
+        model = load_model()
+        
+        if model is None:
+            st.error(" Impossible de charger le modèle. Veuillez vérifier que le fichier 'xgb_house_price_model.pkl' existe.")
+        else:
+            with st.spinner("🔍 Analyse en cours..."):
+                try:
+                    # Prédiction (mémorisée par tuple d'entrées)
+                    prediction, lower, upper = predict_price(record.key())
+                    
+                    render_result(prediction, record, grade_category, lower, upper)
+                    st.success("✅ Prédiction effectuée avec succès!")
+                
+                except Exception as e:
+                    st.error(f" Erreur lors de la prédiction : {str(e)}")
+                    st.info(" Vérifiez que votre modèle attend bien les features dans cet ordre.")
 
 
-# Section Surfaces
-st.markdown('<div class="section-divider"><span class="section-icon"></span> Surfaces et dimensions</div>', unsafe_allow_html=True)
+house_form()
 
-surf_col1, surf_col2, surf_col3, surf_col4 = st.columns([1, 1, 1, 1])
-with surf_col1:
-    sqft_living = st.number_input(
-        "Surface habitable (sqft)",
-        min_value=300,
-        max_value=13000,
-        value=2000,
-        step=50,
-        help="Surface habitable en pieds carrés"
-    )
-with surf_col2:
-    sqft_lot = st.number_input(
-        "Surface terrain (sqft)",
-        min_value=500,
-        max_value=1500000,
-        value=5000,
-        step=100,
-        help="Surface totale du terrain"
-    )
-with surf_col3:
-    sqft_basement = st.number_input(
-        "Surface sous-sol (sqft)",
-        min_value=0,
-        max_value=5000,
-        value=0,
-        step=50,
-        help="Surface du sous-sol (0 si aucun)"
-    )
-with surf_col4:
-    sqft_lot15 = st.number_input(
-        "Surface moyenne terrain voisins (sqft)",
-        min_value=500,
-        max_value=1500000,
-        value=5000,
-        step=100,
-        help="Moyenne des surfaces des 15 plus proches voisins"
-    )
 
-# Section Pièces
-st.markdown('<div class="section-divider"><span class="section-icon"></span> Pièces et aménagements</div>', unsafe_allow_html=True)
-
-pieces_col1, pieces_col2, pieces_col3, pieces_col4 = st.columns([1, 1, 1, 1])
-with pieces_col1:
-    bathrooms = st.number_input(
-        "Nombre salles de bain",
-        min_value=0.5,
-        max_value=8.0,
-        value=2.0,
-        step=0.25,
-        help="Nombre de salles de bain (0.5 = toilettes)"
-    )
-with pieces_col2:
-    waterfront = st.selectbox(
-        "Vue sur l'eau",
-        options=[0, 1],
-        format_func=lambda x: "Oui" if x == 1 else "Non",
-        help="Propriété avec vue sur l'eau"
-    )
-with pieces_col3:
-    view = st.selectbox(
-        "Qualité de la vue",
-        options=[0, 1, 2, 3, 4],
-        format_func=lambda x: ["Aucune", "Moyenne", "Bonne", "Excellente", "Exceptionnelle"][x],
-        help="Qualité de la vue (0-4)"
-    )
-with pieces_col4:
-    condition = st.selectbox(
-        "État du bien",
-        options=[1, 2, 3, 4, 5],
-        index=2,
-        format_func=lambda x: ["Très mauvais", "Mauvais", "Moyen", "Bon", "Très bon"][x-1],
-        help="État général de la propriété (1-5)"
-    )
-
-# Section Qualité
-st.markdown('<div class="section-divider"><span class="section-icon"></span> Qualité et construction</div>', unsafe_allow_html=True)
-
-qual_col1, qual_col2, qual_col3 = st.columns([1, 1, 1])
-with qual_col1:
-    grade = st.number_input(
-        "Grade de construction",
-        min_value=1,
-        max_value=14,
-        value=7,
-        step=1,
-        help="Qualité de construction et design (1-14)"
-    )
-    # Afficher la catégorie basée sur le grade
-    if grade <= 4:
-        grade_category = "Basique"
-    elif grade <= 7:
-        grade_category = "Standard"
-    elif grade <= 10:
-        grade_category = "Haut gamme"
-    else:
-        grade_category = "Luxe"
-    st.caption(f"Catégorie: {grade_category}")
+# Comparaison de plusieurs biens à partir d'un CSV, scorés en un seul appel au modèle
+def score_properties(df):
+    """Complète les champs dérivables puis score tous les biens en un seul appel"""
+    df = df.copy()
     
-with qual_col2:
-    from datetime import datetime
-    current_year = datetime.now().year
+    missing = [f for f in ['lat', 'long'] if f not in df.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
     
-    yr_built = st.number_input(
-        "Année construction",
-        min_value=1000,
-        max_value=current_year,
-        value=1990,
-        step=1,
-        help="Année de construction initiale"
-    )
-with qual_col3:
-    # L'année de rénovation doit être >= année de construction et <= année en cours
-    min_yr_renovated = yr_built if yr_built > 0 else 0
+    # Champs dérivables : année de construction, zipcode (proximité locale), sqft_lot15 (voisinage)
+    if 'annee_construction' not in df.columns and 'yr_built' in df.columns:
+        df['annee_construction'] = df['yr_built']
+    if 'yr_renovated' not in df.columns:
+        df['yr_renovated'] = 0
     
-    yr_renovated = st.number_input(
-        "Année rénovation",
-        min_value=0,
-        max_value=current_year,
-        value=0,
-        step=1,
-        help=f"Année de dernière rénovation (0 si jamais rénové, min: {min_yr_renovated if min_yr_renovated > 0 else 'N/A'})"
-    )
+    if 'zipcode' not in df.columns:
+        df['zipcode'] = np.nan
+    needs_zipcode = df['zipcode'].isna() & df['lat'].notna() & df['long'].notna()
+    if needs_zipcode.any():
+        df.loc[needs_zipcode, 'zipcode'] = estimate_zipcodes_by_proximity(
+            df.loc[needs_zipcode, 'lat'], df.loc[needs_zipcode, 'long']
+        )
+    
+    neighbourhood_table = get_neighbourhood_table()
+    if neighbourhood_table is not None:
+        context = neighbourhood_table.lookup_many(df['lat'], df['long'])
+        derived = pd.Series(context['sqft_lot15'], index=df.index).round()
+        df['sqft_lot15'] = df['sqft_lot15'].fillna(derived) if 'sqft_lot15' in df.columns else derived
+    
+    missing = [f for f in FEATURE_COLUMNS if f not in df.columns]
+    if missing:
+        raise ValueError(f"Colonnes manquantes: {', '.join(missing)}")
     
-    # Validation : vérifier que l'année de rénovation n'est pas inférieure à l'année de construction
-    if yr_renovated > 0 and yr_renovated < yr_built:
-        st.warning(f" L'année de rénovation ({yr_renovated}) ne peut pas être inférieure à l'année de construction ({yr_built})")
+    features = df[FEATURE_COLUMNS].apply(pd.to_numeric, errors='coerce').replace([np.inf, -np.inf], np.nan)
+    # Un zipcode non entier (98001.5) est arrondi ligne par ligne plutôt que de bloquer l'import
+    features['zipcode'] = features['zipcode'].round()
+    valid = features.notna().all(axis=1)
+    
+    df['price'] = np.nan
+    if valid.any():
+        # Un seul appel vectorisé au modèle en cache pour tous les biens
+        prices = load_model().predict(features[valid])
+        df.loc[valid, 'price'] = prices
+        interval_models = load_interval_models()
+        if interval_models is not None:
+            df.loc[valid, 'price_lower'] = np.minimum(interval_models['lower'].predict(features[valid]), prices)
+            df.loc[valid, 'price_upper'] = np.maximum(interval_models['upper'].predict(features[valid]), prices)
+    df['zipcode'] = features['zipcode'].astype('Int64')
+    df['price_per_sqft'] = df['price'] / features['sqft_living']
+    
+    return df
 
-# Note : annee_construction sera égale à yr_built
-annee_construction = yr_built
 
-# Bouton de prédiction
-st.markdown("<br>", unsafe_allow_html=True)
+st.markdown('<div class="section-divider"><span class="section-icon"></span> Comparer plusieurs biens</div>', unsafe_allow_html=True)
 
-if st.button("calculer le prix", use_container_width=True, type="primary"):
-    model = load_model()
-    
-    if model is None:
+# sqft_lot15 n'est dérivable que si la table de voisinage est disponible
+optional_columns = ['zipcode', 'annee_construction', 'yr_renovated']
+if get_neighbourhood_table() is not None:
+    optional_columns.insert(1, 'sqft_lot15')
+
+uploaded = st.file_uploader(
+    "Importer un CSV de biens",
+    type=['csv'],
+    help=f"Une ligne par bien avec les colonnes : {', '.join(FEATURE_COLUMNS)}. "
+         f"{', '.join(optional_columns[:-1])} et {optional_columns[-1]} peuvent être omis."
+)
+
+if uploaded is not None and st.session_state.get('comparison_file') != uploaded.file_id:
+    if load_model() is None:
         st.error(" Impossible de charger le modèle. Veuillez vérifier que le fichier 'xgb_house_price_model.pkl' existe.")
     else:
-        with st.spinner("🔍 Analyse en cours..."):
-            try:
-                # Préparation des données pour la prédiction
-                features_dict = {
-                    'grade': grade,
-                    'waterfront': waterfront,
-                    'sqft_living': sqft_living,
-                    'bathrooms': bathrooms,
-                    'lat': lat,
-                    'view': view,
-                    'long': long,
-                    'yr_built': yr_built,
-                    'zipcode': zipcode,
-                    'sqft_lot': sqft_lot,
-                    'sqft_basement': sqft_basement,
-                    'annee_construction': annee_construction,
-                    'sqft_lot15': sqft_lot15,
-                    'condition': condition,
-                    'yr_renovated': yr_renovated
-                }
-                
-                # Création du DataFrame avec l'ordre exact des features
-                features_df = pd.DataFrame([features_dict])
-                
-                # # Affichage des features pour debug (optionnel)
-                # with st.expander(" Voir les données envoyées au modèle"):
-                #     st.dataframe(features_df, use_container_width=True)
-                
-                # Prédiction
-                prediction = model.predict(features_df)[0]
-                
-                # Affichage du résultat
-                st.markdown(f"""
-                    <div class="prediction-result">
-                        <div class="result-icon">💰</div>
-                        <div>
-                            <div class="result-label">Estimation du prix</div>
-                            <div class="result-value">${prediction:,.2f}</div>
-                            <div class="result-confidence">Modèle: XGBoost</div>
-                        </div>
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                st.success("✅ Prédiction effectuée avec succès!")
-                
-                # Calcul du prix au sqft
-                price_per_sqft = prediction / sqft_living
-                confidence_lower = prediction * 0.92
-                confidence_upper = prediction * 1.08
-                
-                # Informations complémentaires
-                st.markdown(f"""
-                    <div class="info-box">
-                        <strong>ℹ Informations complémentaires:</strong><br>
-                        • Prix au pied carré: ${price_per_sqft:,.2f}/sqft<br>
-                        • Fourchette estimée (±8%): ${confidence_lower:,.2f} - ${confidence_upper:,.2f}<br>
-                        • Surface habitable: {sqft_living:,} sqft ({sqft_living * 0.092903:.1f} m²)<br>
-                        • Grade de qualité: {grade}/14 ({grade_category})<br>
-                        • Année de construction: {yr_built} {f'(rénové en {yr_renovated})' if yr_renovated > 0 else ''}
-                    </div>
-                """, unsafe_allow_html=True)
-                
-                # Graphique comparatif (optionnel)
-                col_info1, col_info2 = st.columns(2)
-                with col_info1:
-                    st.metric(
-                        label="Prix estimé",
-                        value=f"${prediction:,.0f}",
-                        delta=f"${prediction - (sqft_living * 200):,.0f} vs moyenne"
-                    )
-                with col_info2:
-                    st.metric(
-                        label="Prix/sqft",
-                        value=f"${price_per_sqft:.2f}",
-                        delta=f"Grade {grade}"
-                    )
-            
-            except Exception as e:
-                st.error(f" Erreur lors de la prédiction : {str(e)}")
-                st.info(" Vérifiez que votre modèle attend bien les features dans cet ordre.")
+        try:
+            st.session_state.comparison = score_properties(pd.read_csv(uploaded))
+            st.session_state.comparison_file = uploaded.file_id
+            # Relancer pour afficher les marqueurs sur la carte
+            st.rerun()
+        except Exception as e:
+            st.error(f" Erreur lors de l'import : {str(e)}")
+
+comparison = st.session_state.get('comparison')
+if comparison is not None:
+    scored = comparison['price'].notna()
+    st.caption(f"{int(scored.sum())} bien(s) estimé(s)" + (f", {int((~scored).sum())} ligne(s) incomplète(s)" if (~scored).any() else ""))
+    
+    display_columns = [c for c in ['label', 'price', 'price_lower', 'price_upper', 'price_per_sqft'] if c in comparison.columns]
+    st.dataframe(
+        comparison[display_columns + [c for c in FEATURE_COLUMNS if c in comparison.columns]].sort_values('price', ascending=False),
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'price': st.column_config.NumberColumn("Prix estimé", format="$%.0f"),
+            'price_lower': st.column_config.NumberColumn("Borne basse", format="$%.0f"),
+            'price_upper': st.column_config.NumberColumn("Borne haute", format="$%.0f"),
+            'price_per_sqft': st.column_config.NumberColumn("Prix/sqft", format="$%.2f")
+        }
+    )
+    
+    if st.button("Effacer la comparaison"):
+        del st.session_state['comparison']
+        st.session_state.comparison_file = uploaded.file_id if uploaded is not None else None
+        st.rerun()
 
 # Footer
 st.markdown("""
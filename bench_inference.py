@@ -0,0 +1,217 @@
+"""Micro-benchmarks des chemins d'inférence (préparation des features et prédiction)
+
+Mesure isolément chaque chemin critique pour plusieurs tailles de lot et
+enregistre les résultats en JSON pour comparaison avec une référence.
+
+    python bench_inference.py run -o benchmarks/baseline.json
+    python bench_inference.py run -o benchmarks/current.json
+    python bench_inference.py compare benchmarks/baseline.json benchmarks/current.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+
+from HouseApi import (
+    FEATURE_COLUMNS,
+    models,
+    prepare_features,
+    prepare_features_frame,
+    validate_input
+)
+from house_record import HouseRecord
+from zipcodes import estimate_zipcode_by_proximity
+
+DEFAULT_BATCH_SIZES = [1, 16, 256, 100000]
+
+
+def make_rows(n, seed=0):
+    """Génère n maisons réalistes de King County (toutes valides)"""
+    rng = np.random.default_rng(seed)
+    yr_built = rng.integers(1900, 2015, n)
+    renovated = rng.random(n) < 0.1
+    columns = {
+        'grade': rng.integers(4, 12, n),
+        'waterfront': (rng.random(n) < 0.01).astype(int),
+        'sqft_living': rng.integers(600, 6000, n).astype(float),
+        'bathrooms': rng.integers(2, 17, n) * 0.25,
+        'lat': rng.uniform(47.2, 47.77, n),
+        'view': rng.integers(0, 5, n),
+        'long': rng.uniform(-122.5, -121.4, n),
+        'yr_built': yr_built,
+        'zipcode': rng.integers(98001, 98199, n),
+        'sqft_lot': rng.integers(1000, 40000, n).astype(float),
+        'sqft_basement': rng.integers(0, 1500, n).astype(float),
+        'annee_construction': yr_built,
+        'sqft_lot15': rng.integers(1000, 40000, n).astype(float),
+        'condition': rng.integers(1, 6, n),
+        'yr_renovated': np.where(renovated, 2015, 0)
+    }
+    frame = pd.DataFrame(columns)[FEATURE_COLUMNS]
+    return frame.to_dict('records')
+
+
+def rows_to_matrix(rows):
+    return np.array([[row[f] for f in FEATURE_COLUMNS] for row in rows], dtype=np.float32)
+
+
+def build_benchmarks(model):
+    """Chaque benchmark reçoit un contexte préparé hors chronométrage"""
+    booster = model.get_booster()
+
+    return {
+        'prepare_features': (
+            lambda rows: rows,
+            lambda rows: [prepare_features(row) for row in rows]
+        ),
+        'prepare_features_frame': (
+            lambda rows: rows,
+            lambda rows: prepare_features_frame(pd.DataFrame(rows))
+        ),
+        # Conversion seule, sans DataFrame : coût de pandas dans prepare_features
+        'house_record_row': (
+            lambda rows: rows,
+            lambda rows: [HouseRecord.from_mapping(row).to_row() for row in rows]
+        ),
+        'prepare_features_numpy': (
+            lambda rows: rows,
+            rows_to_matrix
+        ),
+        'xgb_predict_dataframe': (
+            lambda rows: prepare_features_frame(pd.DataFrame(rows)),
+            model.predict
+        ),
+        'xgb_predict_dmatrix': (
+            rows_to_matrix,
+            lambda matrix: booster.predict(xgb.DMatrix(matrix, feature_names=FEATURE_COLUMNS))
+        ),
+        'xgb_inplace_predict': (
+            rows_to_matrix,
+            lambda matrix: booster.inplace_predict(matrix, validate_features=False)
+        ),
+        'validate_input': (
+            lambda rows: rows,
+            lambda rows: [validate_input(row) for row in rows]
+        ),
+        'estimate_zipcode_by_proximity': (
+            lambda rows: [(row['lat'], row['long']) for row in rows],
+            lambda coords: [estimate_zipcode_by_proximity(lat, lon) for lat, lon in coords]
+        )
+    }
+
+
+def time_call(func, arg, min_time, min_repeats, max_repeats):
+    """Répète l'appel jusqu'à min_time secondes et min_repeats exécutions"""
+    func(arg)  # échauffement
+    durations = []
+    start = time.perf_counter()
+    while len(durations) < max_repeats and (
+        len(durations) < min_repeats or time.perf_counter() - start < min_time
+    ):
+        t0 = time.perf_counter_ns()
+        func(arg)
+        durations.append(time.perf_counter_ns() - t0)
+    return durations
+
+
+def run(args):
+    model = models.get('xgboost')
+    if model is None:
+        sys.exit("Le modèle XGBoost n'est pas chargé")
+
+    benchmarks = build_benchmarks(model)
+    selected = args.only or list(benchmarks)
+    results = {}
+
+    for batch_size in args.sizes:
+        rows = make_rows(batch_size)
+        for name in selected:
+            setup, func = benchmarks[name]
+            durations = time_call(func, setup(rows), args.min_time, args.min_repeats, args.max_repeats)
+            median_ms = statistics.median(durations) / 1e6
+            result = {
+                'repeats': len(durations),
+                'median_ms': median_ms,
+                'p95_ms': float(np.percentile(durations, 95)) / 1e6,
+                'min_ms': min(durations) / 1e6,
+                'rows_per_s': batch_size / (median_ms / 1000) if median_ms else None
+            }
+            results.setdefault(name, {})[str(batch_size)] = result
+            print(f"{name:32s} batch={batch_size:<7d} median={median_ms:10.4f} ms  "
+                  f"{result['rows_per_s']:14,.0f} rows/s")
+
+    report = {
+        'metadata': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'xgboost': xgb.__version__
+        },
+        'results': results
+    }
+
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nRésultats écrits dans {args.output}")
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    with open(args.current) as f:
+        current = json.load(f)['results']
+
+    regressions = 0
+    print(f"{'chemin':32s} {'lot':>7s} {'référence ms':>14s} {'actuel ms':>12s} {'ratio':>7s}")
+    for name in sorted(set(baseline) & set(current)):
+        for batch_size in sorted(set(baseline[name]) & set(current[name]), key=int):
+            before = baseline[name][batch_size]['median_ms']
+            after = current[name][batch_size]['median_ms']
+            ratio = after / before if before else float('inf')
+            flag = ''
+            if ratio > 1 + args.threshold:
+                flag = '  REGRESSION'
+                regressions += 1
+            elif ratio < 1 - args.threshold:
+                flag = '  amélioration'
+            print(f"{name:32s} {batch_size:>7s} {before:14.4f} {after:12.4f} {ratio:7.2f}{flag}")
+
+    if regressions:
+        print(f"\n{regressions} régression(s) au-delà de {args.threshold:.0%}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Micro-benchmarks d'inférence HomePricer")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = subparsers.add_parser('run', help='Exécute les benchmarks')
+    run_parser.add_argument('-o', '--output', default='benchmarks/results.json')
+    run_parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES)
+    run_parser.add_argument('--only', nargs='+', help='Sous-ensemble de chemins à mesurer')
+    run_parser.add_argument('--min-time', type=float, default=0.5)
+    run_parser.add_argument('--min-repeats', type=int, default=3)
+    run_parser.add_argument('--max-repeats', type=int, default=1000)
+    run_parser.set_defaults(func=run)
+
+    compare_parser = subparsers.add_parser('compare', help='Compare deux fichiers de résultats')
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.10,
+                                help='Variation relative tolérée (défaut 10%%)')
+    compare_parser.set_defaults(func=compare)
+
+    args = parser.parse_args()
+    args.func(args)
@@ -0,0 +1,263 @@
+"""Suivi de la dérive des entrées par résumés de taille fixe
+
+Chaque feature (et le prix prédit) est résumée par un histogramme à bornes
+fixes, complété par des moments calculés en ligne (Welford). La mémoire est
+constante quel que soit le trafic ; les quantiles sont interpolés dans
+l'histogramme. La distance à une référence d'entraînement est mesurée par
+le PSI (Population Stability Index) et la statistique de Kolmogorov-Smirnov.
+
+Construction de la référence :
+    python drift.py kc_house_data.csv -o drift_baseline.json
+"""
+import argparse
+import bisect
+import json
+import math
+import threading
+
+import numpy as np
+import pandas as pd
+
+# (borne basse, borne haute, nombre de bacs) ; les valeurs hors bornes sont
+# comptées dans des bacs de débordement
+DEFAULT_BIN_SPECS = {
+    'grade': (0.5, 13.5, 13),
+    'waterfront': (-0.5, 1.5, 2),
+    'sqft_living': (0, 10000, 50),
+    'bathrooms': (0, 8, 32),
+    'lat': (47.1, 47.8, 35),
+    'view': (-0.5, 4.5, 5),
+    'long': (-122.6, -121.3, 52),
+    'yr_built': (1900, 2030, 26),
+    'zipcode': (97999.5, 98199.5, 200),
+    'sqft_lot': (0, 100000, 50),
+    'sqft_basement': (0, 5000, 50),
+    'annee_construction': (1900, 2030, 26),
+    'sqft_lot15': (0, 100000, 50),
+    'condition': (0.5, 5.5, 5),
+    'yr_renovated': (1899.5, 2029.5, 26),  # 0 (jamais rénové) tombe dans le bac bas
+    'price': (0, 4000000, 80)
+}
+
+DEFAULT_BASELINE_PATH = 'drift_baseline.json'
+QUANTILES = (0.01, 0.25, 0.5, 0.75, 0.99)
+PSI_ALERT_THRESHOLD = 0.2
+
+
+class FeatureSketch:
+    """Histogramme à bornes fixes et moments en ligne d'une variable"""
+
+    def __init__(self, low, high, n_bins):
+        self.edges = np.linspace(low, high, n_bins + 1)
+        self._edges = self.edges.tolist()
+        # bacs : [débordement bas, n_bins bacs, débordement haut]
+        self.counts = np.zeros(n_bins + 2, dtype=np.int64)
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, value):
+        if value != value:  # NaN
+            return
+        self.counts[bisect.bisect_right(self._edges, value)] += 1
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def summarize(self, values):
+        """Résumé d'un lot (histogramme et moments) sans modifier le sketch
+
+        Ne lit que les bornes, fixes : peut être appelé sans verrou.
+        """
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if not len(values):
+            return None
+        bins = np.searchsorted(self.edges, values, side='right')
+        batch_mean = float(values.mean())
+        return {
+            'counts': np.bincount(bins, minlength=len(self.counts)),
+            'count': len(values),
+            'mean': batch_mean,
+            'm2': float(((values - batch_mean) ** 2).sum()),
+            'min': float(values.min()),
+            'max': float(values.max())
+        }
+
+    def merge(self, batch):
+        """Ajoute un résumé de lot calculé par summarize()"""
+        if batch is None:
+            return
+        self.counts += batch['counts']
+
+        # Fusion des moments (Chan et al.)
+        n = batch['count']
+        total = self.count + n
+        delta = batch['mean'] - self.mean
+        self.mean += delta * n / total
+        self._m2 += batch['m2'] + delta ** 2 * self.count * n / total
+        self.count = total
+        self.min = min(self.min, batch['min'])
+        self.max = max(self.max, batch['max'])
+
+    def update_many(self, values):
+        self.merge(self.summarize(values))
+
+    def quantile(self, q):
+        """Quantile approché par interpolation linéaire dans l'histogramme"""
+        if not self.count:
+            return None
+        target = q * self.count
+        cumulative = np.cumsum(self.counts)
+        index = int(np.searchsorted(cumulative, target))
+        if index == 0:
+            return float(self.min)
+        if index == len(self.counts) - 1:
+            return float(self.max)
+        before = cumulative[index - 1]
+        in_bin = self.counts[index]
+        low, high = self.edges[index - 1], self.edges[index]
+        fraction = (target - before) / in_bin if in_bin else 0.0
+        return float(low + fraction * (high - low))
+
+    def to_dict(self):
+        std = math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+        return {
+            'count': self.count,
+            'mean': self.mean if self.count else None,
+            'std': std if self.count else None,
+            'min': self.min if self.count else None,
+            'max': self.max if self.count else None,
+            'quantiles': {f'p{round(q * 100):02d}': self.quantile(q) for q in QUANTILES},
+            'edges': self._edges,
+            'counts': self.counts.tolist()
+        }
+
+
+def psi(expected, actual, epsilon=1e-4):
+    """Population Stability Index entre deux histogrammes de mêmes bacs"""
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+    p = np.clip(expected / expected.sum(), epsilon, None)
+    q = np.clip(actual / actual.sum(), epsilon, None)
+    return float(((q - p) * np.log(q / p)).sum())
+
+
+def ks_distance(expected, actual):
+    """Statistique de Kolmogorov-Smirnov calculée sur les histogrammes"""
+    expected = np.cumsum(expected) / np.sum(expected)
+    actual = np.cumsum(actual) / np.sum(actual)
+    return float(np.abs(expected - actual).max())
+
+
+class DriftMonitor:
+    """Résumés de toutes les features observées par l'API (thread-safe)"""
+
+    def __init__(self, features, bin_specs=DEFAULT_BIN_SPECS, baseline=None):
+        self.features = list(features)
+        self.bin_specs = bin_specs
+        self.baseline = baseline
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.sketches = {
+                name: FeatureSketch(*self.bin_specs[name])
+                for name in self.features + ['price']
+            }
+
+    def observe(self, values, price):
+        """Observe une requête (valeurs dans l'ordre de `features`)"""
+        with self._lock:
+            for name, value in zip(self.features, values):
+                self.sketches[name].update(float(value))
+            self.sketches['price'].update(float(price))
+
+    def observe_many(self, matrix, prices):
+        """Observe un lot (matrice n x features, prix prédits)
+
+        Les histogrammes du lot sont calculés hors verrou, colonne par
+        colonne ; seule l'addition des résumés bloque les requêtes unitaires.
+        """
+        matrix = np.asarray(matrix)
+        sketches = self.sketches
+        batches = {
+            name: sketches[name].summarize(matrix[:, i])
+            for i, name in enumerate(self.features)
+        }
+        batches['price'] = sketches['price'].summarize(prices)
+
+        with self._lock:
+            for name, batch in batches.items():
+                self.sketches[name].merge(batch)
+
+    def summary(self):
+        with self._lock:
+            summary = {name: sketch.to_dict() for name, sketch in self.sketches.items()}
+
+        alerts = []
+        for name, entry in summary.items():
+            reference = (self.baseline or {}).get(name)
+            if reference is None or not entry['count']:
+                continue
+            entry['psi'] = psi(reference['counts'], entry['counts'])
+            entry['ks'] = ks_distance(reference['counts'], entry['counts'])
+            entry['drift'] = entry['psi'] > PSI_ALERT_THRESHOLD
+            if entry['drift']:
+                alerts.append(name)
+
+        return {
+            'features': summary,
+            'baseline_loaded': self.baseline is not None,
+            'psi_alert_threshold': PSI_ALERT_THRESHOLD,
+            'alerts': alerts
+        }
+
+
+def build_baseline(csv_path, output_path=DEFAULT_BASELINE_PATH, bin_specs=DEFAULT_BIN_SPECS):
+    """Calcule les histogrammes de référence à partir des données d'entraînement"""
+    df = pd.read_csv(csv_path)
+    if 'annee_construction' not in df.columns and 'yr_built' in df.columns:
+        df['annee_construction'] = df['yr_built']
+
+    baseline = {}
+    for name, spec in bin_specs.items():
+        if name not in df.columns:
+            continue
+        sketch = FeatureSketch(*spec)
+        sketch.update_many(df[name])
+        baseline[name] = {
+            'edges': sketch.edges.tolist(),
+            'counts': sketch.counts.tolist()
+        }
+
+    with open(output_path, 'w') as f:
+        json.dump(baseline, f)
+    return output_path
+
+
+def load_baseline(path=DEFAULT_BASELINE_PATH):
+    """Charge la référence si elle existe, sinon retourne None"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Construit la référence de dérive')
+    parser.add_argument('csv_path', help="CSV des données d'entraînement (avec la colonne price)")
+    parser.add_argument('-o', '--output', default=DEFAULT_BASELINE_PATH)
+    args = parser.parse_args()
+
+    path = build_baseline(args.csv_path, args.output)
+    print(f"Référence de dérive écrite dans {path}")
@@ -0,0 +1,90 @@
+"""Mesure hors ligne de l'erreur et de l'accélération de chaque tier d'inférence
+
+Le fichier holdout doit contenir les 15 features du modèle et la colonne
+cible `price`.
+
+    python evaluate_tiers.py holdout.csv
+    python evaluate_tiers.py holdout.csv --trees 25 50 100 -o tiers_report.json
+"""
+import argparse
+import json
+import statistics
+import time
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from house_record import FEATURE_COLUMNS
+from tiers import INFERENCE_TIERS, tier_tree_count
+
+
+def time_predict(booster, matrix, iteration_range, repeats):
+    """Temps médian d'une prédiction en place sur tout le holdout"""
+    durations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        booster.inplace_predict(matrix, iteration_range=iteration_range, validate_features=False)
+        durations.append(time.perf_counter() - start)
+    return statistics.median(durations)
+
+
+def evaluate(model, holdout, extra_trees=(), repeats=5):
+    booster = model.get_booster()
+    n_rounds = booster.num_boosted_rounds()
+    matrix = holdout[FEATURE_COLUMNS].to_numpy(dtype=np.float32)
+    target = holdout['price'].to_numpy(dtype=float)
+
+    candidates = {
+        name: tier_tree_count(n_rounds, name)
+        for name in INFERENCE_TIERS
+    }
+    for n_trees in extra_trees:
+        candidates[f'{n_trees}_trees'] = min(n_trees, n_rounds)
+
+    full_time = time_predict(booster, matrix, (0, n_rounds), repeats)
+    full_pred = booster.inplace_predict(matrix, iteration_range=(0, n_rounds), validate_features=False)
+
+    report = {}
+    for name, n_trees in sorted(candidates.items(), key=lambda item: item[1]):
+        iteration_range = (0, n_trees)
+        pred = booster.inplace_predict(matrix, iteration_range=iteration_range, validate_features=False)
+        elapsed = time_predict(booster, matrix, iteration_range, repeats)
+        error = pred - target
+
+        report[name] = {
+            'trees': n_trees,
+            'rmse': float(np.sqrt(np.mean(error ** 2))),
+            'mae': float(np.mean(np.abs(error))),
+            'mape': float(np.mean(np.abs(error) / target)),
+            'mean_abs_diff_vs_full': float(np.mean(np.abs(pred - full_pred))),
+            'latency_ms': elapsed * 1000,
+            'rows_per_s': len(matrix) / elapsed,
+            'speedup': full_time / elapsed
+        }
+    return report
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Évalue les tiers d'inférence XGBoost sur un holdout")
+    parser.add_argument('holdout', help='CSV avec les features et la colonne price')
+    parser.add_argument('--model', default='xgb_house_price_model.pkl')
+    parser.add_argument('--trees', type=int, nargs='*', default=[],
+                        help="Nombres d'arbres supplémentaires à évaluer")
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('-o', '--output', help='Écrit le rapport en JSON')
+    args = parser.parse_args()
+
+    holdout = pd.read_csv(args.holdout).dropna(subset=FEATURE_COLUMNS + ['price'])
+    model = joblib.load(args.model)
+    report = evaluate(model, holdout, args.trees, args.repeats)
+
+    print(f"{'tier':14s} {'arbres':>7s} {'RMSE':>12s} {'MAPE':>8s} {'ms':>10s} {'accélération':>13s}")
+    for name, row in report.items():
+        print(f"{name:14s} {row['trees']:7d} {row['rmse']:12,.0f} {row['mape']:8.2%} "
+              f"{row['latency_ms']:10.2f} {row['speedup']:12.2f}x")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'rows': len(holdout), 'tiers': report}, f, indent=2)
+        print(f"\nRapport écrit dans {args.output}")
@@ -0,0 +1,151 @@
+"""Enregistrement compact d'une maison, partagé par l'API et l'interface
+
+Les 15 features sont converties une seule fois, dans l'ordre exact attendu
+par les modèles, vers un tableau NumPy float64. Validation, inférence et
+réponse travaillent ensuite sur ce même tableau, sans nouvelle conversion ;
+la ligne du modèle est une vue du tableau (aucune copie).
+"""
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Features attendues par les modèles, dans l'ordre exact d'entraînement
+FEATURE_COLUMNS = [
+    'grade',
+    'waterfront',
+    'sqft_living',
+    'bathrooms',
+    'lat',
+    'view',
+    'long',
+    'yr_built',
+    'zipcode',
+    'sqft_lot',
+    'sqft_basement',
+    'annee_construction',
+    'sqft_lot15',
+    'condition',
+    'yr_renovated'
+]
+
+FEATURE_INDEX = {feature: i for i, feature in enumerate(FEATURE_COLUMNS)}
+
+# Features entières (les autres sont des flottants)
+INT_FEATURES = {
+    'grade', 'waterfront', 'view', 'yr_built', 'zipcode',
+    'annee_construction', 'condition', 'yr_renovated'
+}
+
+# Plages valides par feature (None = année en cours)
+FEATURE_RANGES = {
+    'grade': (1, 13),
+    'waterfront': (0, 1),
+    'sqft_living': (100, 20000),
+    'bathrooms': (0.5, 10),
+    'lat': (-90, 90),
+    'view': (0, 4),
+    'long': (-180, 180),
+    'yr_built': (1800, None),
+    'zipcode': (10000, 99999),
+    'sqft_lot': (500, 1000000),
+    'sqft_basement': (0, 10000),
+    'annee_construction': (1800, None),
+    'sqft_lot15': (500, 1000000),
+    'condition': (1, 5),
+    'yr_renovated': (1900, None)  # 0 accepté (jamais rénové)
+}
+
+# Messages d'erreur de plage, par feature
+RANGE_MESSAGES = {
+    'grade': "Le grade doit être entre 1 et 13",
+    'waterfront': "Waterfront doit être 0 (Non) ou 1 (Oui)",
+    'sqft_living': "La surface habitable (sqft_living) doit être entre 100 et 20000 sqft",
+    'bathrooms': "Le nombre de salles de bain doit être entre 0.5 et 10",
+    'lat': "La latitude doit être entre -90 et 90",
+    'view': "La qualité de la vue (view) doit être entre 0 et 4",
+    'long': "La longitude doit être entre -180 et 180",
+    'yr_built': "L'année de construction (yr_built) doit être entre 1800 et {current_year}",
+    'zipcode': "Le zipcode doit être un code postal valide (5 chiffres)",
+    'sqft_lot': "La surface du terrain (sqft_lot) doit être entre 500 et 1000000 sqft",
+    'sqft_basement': "La surface du sous-sol (sqft_basement) doit être entre 0 et 10000 sqft",
+    'annee_construction': "L'année de construction (annee_construction) doit être entre 1800 et {current_year}",
+    'sqft_lot15': "La surface des terrains voisins (sqft_lot15) doit être entre 500 et 1000000 sqft",
+    'condition': "L'état de la maison (condition) doit être entre 1 et 5",
+    'yr_renovated': "L'année de rénovation (yr_renovated) doit être 0 (non rénové) ou entre 1900 et {current_year}"
+}
+
+_CASTS = [int if feature in INT_FEATURES else float for feature in FEATURE_COLUMNS]
+
+
+class HouseRecord:
+    """Les 15 features d'une maison dans un tableau float64 de taille fixe"""
+
+    __slots__ = ('values',)
+
+    def __init__(self, values):
+        self.values = values
+
+    @classmethod
+    def from_mapping(cls, data):
+        """Convertit un dict (JSON, formulaire) une seule fois
+
+        Lève ValueError avec un message destiné à l'utilisateur si des champs
+        manquent ou ne sont pas convertibles.
+        """
+        missing_fields = [field for field in FEATURE_COLUMNS if field not in data]
+        if missing_fields:
+            raise ValueError(f"Champs manquants: {', '.join(missing_fields)}")
+
+        try:
+            values = np.fromiter(
+                (cast(data[feature]) for cast, feature in zip(_CASTS, FEATURE_COLUMNS)),
+                dtype=np.float64,
+                count=len(FEATURE_COLUMNS)
+            )
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"Erreur de type de données: {str(e)}")
+
+        return cls(values)
+
+    @classmethod
+    def from_key(cls, key):
+        """Reconstruit un enregistrement à partir de key()"""
+        return cls(np.array(key, dtype=np.float64))
+
+    def __getitem__(self, feature):
+        value = self.values[FEATURE_INDEX[feature]]
+        return int(value) if feature in INT_FEATURES else float(value)
+
+    def validate(self):
+        """Valide les plages de valeurs ; retourne (bool, message)"""
+        current_year = datetime.now().year
+
+        for feature, value in zip(FEATURE_COLUMNS, self.values.tolist()):
+            if feature == 'yr_renovated' and value == 0:
+                continue
+            low, high = FEATURE_RANGES[feature]
+            high = current_year if high is None else high
+            if value < low or value > high:
+                return False, RANGE_MESSAGES[feature].format(current_year=current_year)
+
+        return True, "Validation réussie"
+
+    def key(self):
+        """Tuple hashable des valeurs (mémoïsation, coalescence)"""
+        return tuple(self.values.tolist())
+
+    def to_row(self):
+        """Ligne (1, 15) pour le modèle : vue sur le tableau, sans copie"""
+        return self.values.reshape(1, -1)
+
+    def to_frame(self):
+        """DataFrame (1, 15) nommé pour le modèle, construit sur la même mémoire"""
+        return pd.DataFrame(self.to_row(), columns=FEATURE_COLUMNS, copy=False)
+
+    def as_dict(self):
+        """Valeurs typées (int / float) dans l'ordre des features"""
+        return {
+            feature: cast(value)
+            for cast, feature, value in zip(_CASTS, FEATURE_COLUMNS, self.values.tolist())
+        }
@@ -0,0 +1,18 @@
+"""Configuration des modèles de quantiles (intervalle de prédiction)
+
+Module sans effet de bord, partagé par l'API et l'interface Streamlit pour
+que les deux affichent l'intervalle des mêmes modèles : l'importer ne charge
+aucun modèle.
+"""
+import os
+
+# Modèles de quantiles compagnons du modèle XGBoost (intervalle de prédiction)
+INTERVAL_MODEL_PATHS = {
+    'lower': os.environ.get('INTERVAL_LOWER_MODEL_PATH', 'xgb_house_price_model_lower.pkl'),
+    'upper': os.environ.get('INTERVAL_UPPER_MODEL_PATH', 'xgb_house_price_model_upper.pkl')
+}
+# Quantiles sur lesquels les modèles compagnons ont été entraînés
+INTERVAL_QUANTILES = (
+    float(os.environ.get('INTERVAL_LOWER_QUANTILE', '0.1')),
+    float(os.environ.get('INTERVAL_UPPER_QUANTILE', '0.9'))
+)
@@ -0,0 +1,161 @@
+"""Jobs asynchrones de valorisation de portefeuilles
+
+Un job reçoit un DataFrame complet, le découpe en blocs et le score bloc par
+bloc dans un pool de workers local, séparé des requêtes interactives. Le
+client interroge ensuite l'état du job puis télécharge les résultats.
+
+La mémoire est bornée : au-delà de `max_pending` jobs non terminés, les
+nouvelles soumissions sont refusées (JobQueueFull), et les résultats des jobs
+terminés expirent après `result_ttl` secondes ou peuvent être supprimés.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+
+class JobQueueFull(Exception):
+    """Trop de jobs en attente ou en cours pour en accepter un nouveau"""
+
+
+class Job:
+    """État d'un job de valorisation"""
+
+    def __init__(self, job_id, total_rows, model_name):
+        self.id = job_id
+        self.model_name = model_name
+        self.status = 'queued'
+        self.total_rows = total_rows
+        self.processed_rows = 0
+        self.failed_rows = 0
+        self.error = None
+        self.result = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.status in ('done', 'failed')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'model': self.model_name,
+            'total_rows': self.total_rows,
+            'processed_rows': self.processed_rows,
+            'failed_rows': self.failed_rows,
+            'progress': self.processed_rows / self.total_rows if self.total_rows else 1.0,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class JobManager:
+    """Exécute les jobs dans un pool de workers borné
+
+    `score_chunk(frame, model_name)` doit retourner un DataFrame de résultats
+    indexé comme `frame`, avec une colonne `error` (NaN si la ligne est valide).
+    """
+
+    def __init__(self, score_chunk, max_workers=1, chunk_size=10000, max_jobs=100,
+                 max_pending=10, result_ttl=3600):
+        self.score_chunk = score_chunk
+        self.chunk_size = chunk_size
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.result_ttl = timedelta(seconds=result_ttl)
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='jobs')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, frame, model_name):
+        """Enregistre un job et le place dans la file des workers
+
+        Lève JobQueueFull si `max_pending` jobs sont déjà en attente ou en cours :
+        chacun garde son portefeuille complet en mémoire jusqu'à son exécution.
+        """
+        job = Job(uuid.uuid4().hex, len(frame), model_name)
+
+        with self._lock:
+            self._evict()
+            pending = sum(1 for existing in self._jobs.values() if not existing.finished)
+            if pending >= self.max_pending:
+                raise JobQueueFull(
+                    f"{pending} jobs sont déjà en attente ou en cours (maximum {self.max_pending})"
+                )
+            self._jobs[job.id] = job
+
+        self._executor.submit(self._run, job, frame)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._evict()
+            return self._jobs.get(job_id)
+
+    def list(self):
+        with self._lock:
+            self._evict()
+            return list(self._jobs.values())
+
+    def delete(self, job_id):
+        """Supprime un job terminé et ses résultats
+
+        Retourne le job supprimé, None s'il est inconnu ; lève ValueError s'il
+        n'est pas encore terminé.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if not job.finished:
+                raise ValueError(f"Le job est à l'état {job.status}")
+            del self._jobs[job_id]
+            return job
+
+    def _evict(self):
+        """Oublie les jobs terminés expirés, puis les plus anciens au-delà de max_jobs"""
+        expired_before = datetime.now() - self.result_ttl
+        finished = []
+        for job_id, job in list(self._jobs.items()):
+            if not job.finished:
+                continue
+            if job.finished_at < expired_before:
+                del self._jobs[job_id]
+            else:
+                finished.append(job_id)
+        while len(self._jobs) >= self.max_jobs and finished:
+            del self._jobs[finished.pop(0)]
+
+    def _run(self, job, frame):
+        job.status = 'running'
+        job.started_at = datetime.now()
+
+        try:
+            results = []
+            for start in range(0, len(frame), self.chunk_size):
+                chunk = frame.iloc[start:start + self.chunk_size]
+                scored = self.score_chunk(chunk, job.model_name)
+                results.append(scored)
+
+                job.processed_rows += len(chunk)
+                job.failed_rows += int(scored['error'].notna().sum())
+
+            if results:
+                scored = pd.concat(results)
+                frame = pd.concat([frame.drop(columns=scored.columns, errors='ignore'), scored], axis=1)
+            job.result = frame
+            job.status = 'done'
+        except Exception as e:
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished_at = datetime.now()
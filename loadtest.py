@@ -0,0 +1,183 @@
+"""Test de charge comparatif des serveurs Flask et asynchrone
+
+Ouvre N connexions keep-alive simultanées vers chaque serveur et y enchaîne
+des requêtes /api/predict pendant une durée donnée, puis compare débit et
+latences. N'utilise que la bibliothèque standard (HTTP/1.1 sur asyncio).
+
+Chaque requête envoie une maison différente (sqft_living tiré d'un générateur
+initialisé par --seed) : sinon les deux serveurs coalescent presque toutes
+les requêtes identiques simultanées et le test mesure la coalescence plutôt
+que le mode de service. --identical rétablit un corps unique.
+
+    python HouseApi.py                       # port 5000
+    python HouseApiAsync.py                  # port 8000
+    python loadtest.py http://localhost:5000 http://localhost:8000 -c 1000 -d 30
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from urllib.parse import urlsplit
+
+HOUSE = {
+    "grade": 9,
+    "waterfront": 0,
+    "sqft_living": 3200,
+    "bathrooms": 3.0,
+    "lat": 47.6205,
+    "view": 2,
+    "long": -122.3493,
+    "yr_built": 2005,
+    "zipcode": 98101,
+    "sqft_lot": 9000,
+    "sqft_basement": 800,
+    "annee_construction": 2005,
+    "sqft_lot15": 8500,
+    "condition": 4,
+    "yr_renovated": 0
+}
+
+
+async def read_response(reader):
+    """Lit une réponse HTTP/1.1 (Content-Length ou chunked) ; retourne le code"""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connexion fermée par le serveur')
+    status = int(status_line.split()[1])
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding') == 'chunked':
+        while True:
+            size = int((await reader.readline()).strip(), 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+
+    return status, headers.get('connection', '').lower() == 'close'
+
+
+def make_body(rng):
+    """Corps JSON d'une requête ; une maison différente si `rng` est fourni"""
+    house = HOUSE
+    if rng is not None:
+        house = dict(HOUSE, sqft_living=round(rng.uniform(1000, 6000), 1))
+    return json.dumps(house).encode()
+
+
+async def connection_worker(url, rng, deadline, latencies, errors):
+    parts = urlsplit(url)
+
+    def build_request():
+        body = make_body(rng)
+        return (
+            f"POST /api/predict HTTP/1.1\r\n"
+            f"Host: {parts.netloc}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: keep-alive\r\n\r\n"
+        ).encode() + body
+
+    request = build_request()
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(parts.hostname, parts.port or 80)
+            if rng is not None:
+                request = build_request()
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status, close = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+            if close:
+                writer.close()
+                writer = None
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.05)
+
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(url, connections, duration, seed=0, identical=False):
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        connection_worker(
+            url, None if identical else random.Random(seed * 100003 + i),
+            deadline, latencies, errors
+        )
+        for i in range(connections)
+    ))
+    elapsed = time.perf_counter() - start
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+
+    def percentile(q):
+        if not latencies_ms:
+            return None
+        return latencies_ms[min(len(latencies_ms) - 1, int(q * len(latencies_ms)))]
+
+    return {
+        'url': url,
+        'connections': connections,
+        'payload': 'identical' if identical else f'distinct (seed {seed})',
+        'requests': len(latencies),
+        'errors': len(errors),
+        'error_kinds': sorted({str(e) for e in errors}),
+        'throughput_rps': len(latencies) / elapsed,
+        'mean_ms': statistics.fmean(latencies_ms) if latencies_ms else None,
+        'p50_ms': percentile(0.50),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99)
+    }
+
+
+def format_ms(value):
+    return f"{value:10.1f}" if value is not None else f"{'-':>10s}"
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compare les serveurs HomePricer sous charge')
+    parser.add_argument('urls', nargs='+', help='URL de base de chaque serveur à comparer')
+    parser.add_argument('-c', '--connections', type=int, default=500)
+    parser.add_argument('-d', '--duration', type=float, default=20)
+    parser.add_argument('--seed', type=int, default=0,
+                        help='Graine des maisons envoyées (mêmes requêtes pour chaque serveur)')
+    parser.add_argument('--identical', action='store_true',
+                        help='Envoie toujours la même maison (mesure la coalescence)')
+    parser.add_argument('-o', '--output', help='Écrit les résultats en JSON')
+    args = parser.parse_args()
+
+    results = []
+    for url in args.urls:
+        print(f"Charge sur {url} ({args.connections} connexions, {args.duration:.0f} s)...")
+        results.append(asyncio.run(run_load(url, args.connections, args.duration, args.seed, args.identical)))
+
+    print(f"\n{'serveur':32s} {'req/s':>9s} {'moy ms':>10s} {'p50 ms':>10s} {'p95 ms':>10s} {'p99 ms':>10s} {'erreurs':>8s}")
+    for r in results:
+        print(f"{r['url']:32s} {r['throughput_rps']:9.1f} {format_ms(r['mean_ms'])} {format_ms(r['p50_ms'])} "
+              f"{format_ms(r['p95_ms'])} {format_ms(r['p99_ms'])} {r['errors']:8d}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,110 @@
+"""Statistiques de marché par code postal, précalculées hors ligne
+
+Les agrégats (prix médian, prix médian au sqft, volume de ventes, tendance)
+sont stockés dans un fichier NumPy compact indexé directement par code
+postal : la recherche est en O(1).
+
+Construction :
+    python market.py kc_house_data.csv -o market_stats.npz
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+MARKET_COLUMNS = ['median_price', 'median_price_per_sqft', 'volume', 'trend']
+
+DEFAULT_MARKET_PATH = 'market_stats.npz'
+
+
+def build_market_stats(csv_path, output_path=DEFAULT_MARKET_PATH):
+    """Calcule les agrégats par code postal à partir d'un CSV de ventes
+
+    La tendance est la variation relative du prix médian entre la seconde
+    et la première moitié de la période couverte par les ventes.
+    """
+    df = pd.read_csv(csv_path).dropna(subset=['zipcode', 'price', 'sqft_living'])
+    df['zipcode'] = df['zipcode'].astype(int)
+    df['price_per_sqft'] = df['price'] / df['sqft_living']
+
+    grouped = df.groupby('zipcode')
+    stats = pd.DataFrame({
+        'median_price': grouped['price'].median(),
+        'median_price_per_sqft': grouped['price_per_sqft'].median(),
+        'volume': grouped.size(),
+        'trend': np.nan
+    })
+
+    if 'date' in df.columns:
+        dates = pd.to_datetime(df['date'], format='mixed')
+        midpoint = dates.min() + (dates.max() - dates.min()) / 2
+        early = df[dates < midpoint].groupby('zipcode')['price'].median()
+        late = df[dates >= midpoint].groupby('zipcode')['price'].median()
+        stats['trend'] = (late / early - 1).reindex(stats.index)
+
+    zipcodes = stats.index.to_numpy()
+    base = int(zipcodes.min())
+    index = np.full(int(zipcodes.max()) - base + 1, -1, dtype=np.int32)
+    index[zipcodes - base] = np.arange(len(zipcodes), dtype=np.int32)
+
+    np.savez_compressed(
+        output_path,
+        base=np.array(base),
+        index=index,
+        columns=np.array(MARKET_COLUMNS),
+        values=stats[MARKET_COLUMNS].to_numpy(dtype=np.float32)
+    )
+    return output_path
+
+
+class MarketStats:
+    """Table des statistiques de marché chargée en mémoire"""
+
+    def __init__(self, base, index, columns, values):
+        self.base = int(base)
+        self.index = index
+        self.columns = list(columns)
+        self.values = values
+
+    @classmethod
+    def load(cls, path=DEFAULT_MARKET_PATH):
+        with np.load(path) as data:
+            return cls(
+                base=data['base'],
+                index=data['index'],
+                columns=data['columns'].tolist(),
+                values=data['values']
+            )
+
+    def lookup(self, zipcode):
+        """Statistiques du code postal, ou None s'il est inconnu"""
+        offset = int(zipcode) - self.base
+        if not 0 <= offset < len(self.index):
+            return None
+        row = self.index[offset]
+        if row < 0:
+            return None
+
+        stats = dict(zip(self.columns, self.values[row].tolist()))
+        stats['volume'] = int(stats['volume'])
+        if stats['trend'] != stats['trend']:  # NaN : pas de tendance calculable
+            stats['trend'] = None
+        return stats
+
+
+def load_market_stats(path=DEFAULT_MARKET_PATH):
+    """Charge la table si elle existe, sinon retourne None"""
+    try:
+        return MarketStats.load(path)
+    except FileNotFoundError:
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Construit les statistiques de marché par code postal')
+    parser.add_argument('csv_path', help='CSV de ventes (colonnes zipcode, price, sqft_living, date)')
+    parser.add_argument('-o', '--output', default=DEFAULT_MARKET_PATH)
+    args = parser.parse_args()
+
+    path = build_market_stats(args.csv_path, args.output)
+    print(f"Statistiques de marché écrites dans {path}")
@@ -0,0 +1,138 @@
+"""Table précalculée d'agrégats de voisinage (sqft_lot15, sqft_living15...)
+
+La table est construite hors ligne à partir d'un jeu de données local (par
+exemple kc_house_data.csv) puis chargée sous forme de tableaux NumPy
+compacts : une grille régulière en latitude/longitude dont chaque cellule
+contient la médiane des features de contexte. La recherche est en O(1).
+
+Construction :
+    python neighbourhood.py kc_house_data.csv -o neighbourhood_table.npz
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+# Features de contexte calculées à partir des voisins
+CONTEXT_FEATURES = ['sqft_lot15', 'sqft_living15']
+
+DEFAULT_TABLE_PATH = 'neighbourhood_table.npz'
+DEFAULT_CELL_SIZE = 0.01  # degrés, environ 1.1 km en latitude
+
+
+def build_neighbourhood_table(csv_path, output_path=DEFAULT_TABLE_PATH, cell_size=DEFAULT_CELL_SIZE):
+    """Construit la grille d'agrégats à partir d'un CSV de ventes"""
+    df = pd.read_csv(csv_path)
+    features = [f for f in CONTEXT_FEATURES if f in df.columns]
+    if not features:
+        raise ValueError(f"Aucune feature de contexte ({', '.join(CONTEXT_FEATURES)}) dans {csv_path}")
+
+    df = df.dropna(subset=['lat', 'long'] + features)
+
+    lat0 = np.floor(df['lat'].min() / cell_size) * cell_size
+    lon0 = np.floor(df['long'].min() / cell_size) * cell_size
+    n_lat = int((df['lat'].max() - lat0) // cell_size) + 1
+    n_lon = int((df['long'].max() - lon0) // cell_size) + 1
+
+    lat_idx = ((df['lat'] - lat0) // cell_size).astype(int).clip(0, n_lat - 1)
+    lon_idx = ((df['long'] - lon0) // cell_size).astype(int).clip(0, n_lon - 1)
+    cell = lat_idx * n_lon + lon_idx
+
+    grouped = df.groupby(cell)[features].median()
+    cell_counts = cell.value_counts()
+    counts = np.zeros(n_lat * n_lon, dtype=np.int32)
+    counts[cell_counts.index.to_numpy()] = cell_counts.to_numpy()
+
+    values = np.full((len(features), n_lat * n_lon), np.nan, dtype=np.float32)
+    values[:, grouped.index.to_numpy()] = grouped.to_numpy().T
+
+    # Remplir les cellules vides avec la cellule non vide la plus proche,
+    # pour que la recherche en ligne n'ait jamais à chercher de voisin
+    filled = grouped.index.to_numpy()
+    empty = np.setdiff1d(np.arange(n_lat * n_lon), filled)
+    if len(empty):
+        filled_coords = np.stack([filled // n_lon, filled % n_lon], axis=1)
+        for chunk in np.array_split(empty, max(1, len(empty) // 1024)):
+            chunk_coords = np.stack([chunk // n_lon, chunk % n_lon], axis=1)
+            distances = ((chunk_coords[:, None, :] - filled_coords[None, :, :]) ** 2).sum(axis=2)
+            values[:, chunk] = values[:, filled[distances.argmin(axis=1)]]
+
+    np.savez_compressed(
+        output_path,
+        features=np.array(features),
+        origin=np.array([lat0, lon0]),
+        cell_size=np.array(cell_size),
+        shape=np.array([n_lat, n_lon]),
+        values=values.reshape(len(features), n_lat, n_lon),
+        counts=counts.reshape(n_lat, n_lon)
+    )
+    return output_path
+
+
+class NeighbourhoodTable:
+    """Grille d'agrégats de voisinage chargée en mémoire"""
+
+    def __init__(self, features, origin, cell_size, values, counts):
+        self.features = list(features)
+        self.lat0, self.lon0 = float(origin[0]), float(origin[1])
+        self.cell_size = float(cell_size)
+        self.values = values
+        self.counts = counts
+        self.n_lat, self.n_lon = values.shape[1], values.shape[2]
+
+    @classmethod
+    def load(cls, path=DEFAULT_TABLE_PATH):
+        with np.load(path) as data:
+            return cls(
+                features=data['features'].tolist(),
+                origin=data['origin'],
+                cell_size=data['cell_size'],
+                values=data['values'],
+                counts=data['counts']
+            )
+
+    def lookup_many(self, lats, lons):
+        """Recherche vectorisée ; les points hors de la grille donnent NaN"""
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        lat_idx = np.floor((lats - self.lat0) / self.cell_size).astype(int)
+        lon_idx = np.floor((lons - self.lon0) / self.cell_size).astype(int)
+        inside = (lat_idx >= 0) & (lat_idx < self.n_lat) & (lon_idx >= 0) & (lon_idx < self.n_lon)
+
+        result = {}
+        for i, feature in enumerate(self.features):
+            column = np.full(lats.shape, np.nan)
+            column[inside] = self.values[i, lat_idx[inside], lon_idx[inside]]
+            result[feature] = column
+        return result
+
+    def lookup(self, lat, lon):
+        """Agrégats de la cellule contenant (lat, lon), ou None hors de la zone couverte"""
+        lat_idx = int(np.floor((lat - self.lat0) / self.cell_size))
+        lon_idx = int(np.floor((lon - self.lon0) / self.cell_size))
+        if not (0 <= lat_idx < self.n_lat and 0 <= lon_idx < self.n_lon):
+            return None
+
+        return {
+            feature: float(self.values[i, lat_idx, lon_idx])
+            for i, feature in enumerate(self.features)
+        }
+
+
+def load_neighbourhood_table(path=DEFAULT_TABLE_PATH):
+    """Charge la table si elle existe, sinon retourne None"""
+    try:
+        return NeighbourhoodTable.load(path)
+    except FileNotFoundError:
+        return None
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Construit la table d'agrégats de voisinage")
+    parser.add_argument('csv_path', help="CSV de ventes (colonnes lat, long, sqft_lot15...)")
+    parser.add_argument('-o', '--output', default=DEFAULT_TABLE_PATH)
+    parser.add_argument('--cell-size', type=float, default=DEFAULT_CELL_SIZE)
+    args = parser.parse_args()
+
+    path = build_neighbourhood_table(args.csv_path, args.output, args.cell_size)
+    print(f"Table de voisinage écrite dans {path}")
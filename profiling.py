@@ -0,0 +1,154 @@
+"""Profilage à la demande des requêtes de l'API
+
+Le profileur s'accroche au thread courant via sys.setprofile et mesure, pour
+chaque fonction (Python et C), le temps mural et le temps CPU du thread. Les
+résultats s'exportent en piles repliées (collapsed stacks, pour les flame
+graphs) ou au format pstats lisible par `python -m pstats`.
+"""
+import marshal
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime
+
+CLOCKS = ('wall', 'cpu')
+
+
+def _frame_key(frame):
+    code = frame.f_code
+    return (code.co_filename, code.co_firstlineno, code.co_name)
+
+
+def _c_function_key(func):
+    module = getattr(func, '__module__', None) or ''
+    qualname = getattr(func, '__qualname__', None) or getattr(func, '__name__', repr(func))
+    return ('~', 0, f'<built-in method {module}.{qualname}>' if module else f'<{qualname}>')
+
+
+def _label(key):
+    filename, lineno, name = key
+    if filename == '~':
+        return name
+    return f'{name} ({os.path.basename(filename)}:{lineno})'
+
+
+class RequestProfiler:
+    """Profileur de la pile d'appels d'une requête (thread courant uniquement)"""
+
+    def __init__(self):
+        # Pile active : [clé, début mural, début CPU, enfants mural, enfants CPU]
+        self._stack = []
+        # Temps propre par pile repliée
+        self.collapsed = {clock: defaultdict(int) for clock in CLOCKS}
+        # Statistiques au format pstats : clé -> [cc, nc, tt, ct, appelants]
+        self.stats = {clock: {} for clock in CLOCKS}
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+
+    def __enter__(self):
+        self._start = (time.perf_counter(), time.thread_time())
+        sys.setprofile(self._dispatch)
+        return self
+
+    def __exit__(self, *exc_info):
+        sys.setprofile(None)
+        wall, cpu = time.perf_counter(), time.thread_time()
+        # Fermer les appels restés ouverts (sortie par exception du bloc)
+        while self._stack:
+            self._pop(wall, cpu)
+        self.wall_time = wall - self._start[0]
+        self.cpu_time = cpu - self._start[1]
+        return False
+
+    def _dispatch(self, frame, event, arg):
+        wall, cpu = time.perf_counter(), time.thread_time()
+        if event == 'call':
+            self._stack.append([_frame_key(frame), wall, cpu, 0.0, 0.0])
+        elif event == 'c_call':
+            self._stack.append([_c_function_key(arg), wall, cpu, 0.0, 0.0])
+        elif event in ('return', 'c_return', 'c_exception') and self._stack:
+            self._pop(wall, cpu)
+
+    def _pop(self, wall, cpu):
+        key, wall_start, cpu_start, wall_children, cpu_children = self._stack.pop()
+        parent = self._stack[-1] if self._stack else None
+        path = ';'.join(_label(entry[0]) for entry in self._stack + [[key]])
+        recursive = any(entry[0] == key for entry in self._stack)
+
+        for clock, total, children in (
+            ('wall', wall - wall_start, wall_children),
+            ('cpu', cpu - cpu_start, cpu_children)
+        ):
+            own = max(total - children, 0.0)
+            self.collapsed[clock][path] += int(own * 1e6)
+
+            entry = self.stats[clock].setdefault(key, [0, 0, 0.0, 0.0, {}])
+            entry[1] += 1
+            entry[2] += own
+            if not recursive:
+                entry[0] += 1
+                entry[3] += total
+            if parent is not None:
+                edge = entry[4].setdefault(parent[0], [0, 0, 0.0, 0.0])
+                edge[0] += 1
+                edge[1] += 0 if recursive else 1
+                edge[2] += own
+                edge[3] += 0.0 if recursive else total
+
+        if parent is not None:
+            parent[3] += wall - wall_start
+            parent[4] += cpu - cpu_start
+
+    def collapsed_text(self, clock='wall'):
+        """Piles repliées : 'f1;f2;f3 <microsecondes>' par ligne"""
+        return '\n'.join(
+            f'{path} {value}'
+            for path, value in sorted(self.collapsed[clock].items())
+            if value > 0
+        ) + '\n'
+
+    def pstats_bytes(self, clock='wall'):
+        """Sérialisation compatible avec pstats.Stats (format marshal de cProfile)"""
+        stats = {
+            key: (cc, nc, tt, ct, {caller: tuple(edge) for caller, edge in callers.items()})
+            for key, (cc, nc, tt, ct, callers) in self.stats[clock].items()
+        }
+        return marshal.dumps(stats)
+
+
+class ProfileStore:
+    """Conserve les derniers profils (mémoire bornée)"""
+
+    def __init__(self, max_profiles=50):
+        self._profiles = deque(maxlen=max_profiles)
+        self._lock = threading.Lock()
+
+    def add(self, profiler, endpoint):
+        record = {
+            'id': uuid.uuid4().hex,
+            'endpoint': endpoint,
+            'timestamp': datetime.now().isoformat(),
+            'wall_ms': profiler.wall_time * 1000,
+            'cpu_ms': profiler.cpu_time * 1000,
+            'profiler': profiler
+        }
+        with self._lock:
+            self._profiles.append(record)
+        return record
+
+    def get(self, profile_id):
+        with self._lock:
+            for record in self._profiles:
+                if record['id'] == profile_id:
+                    return record
+        return None
+
+    def list(self):
+        with self._lock:
+            return [
+                {k: v for k, v in record.items() if k != 'profiler'}
+                for record in self._profiles
+            ]
@@ -0,0 +1,129 @@
+"""Évaluation en shadow d'un modèle candidat, hors du chemin critique de l'API"""
+import queue
+import random
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+
+class ShadowEvaluator:
+    """Score un modèle candidat en arrière-plan sur une copie du trafic réel
+
+    Les features sont déposées dans une file bornée sans jamais bloquer :
+    si la file est pleine, l'échantillon est simplement abandonné. Un thread
+    dédié score le modèle et conserve un historique borné des écarts avec
+    la prédiction de production et de la latence du modèle shadow.
+    """
+
+    def __init__(self, name, model, sample_rate=1.0, queue_size=1000, history_size=10000):
+        self.name = name
+        self.model = model
+        self.sample_rate = sample_rate
+
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._records = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+        self._counters = {
+            'submitted': 0,
+            'sampled_out': 0,
+            'dropped': 0,
+            'scored': 0,
+            'errors': 0
+        }
+
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f'shadow-{name}',
+            daemon=True
+        )
+        self._thread.start()
+
+    def _count(self, counter):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def submit(self, features, production_price, production_model):
+        """Dépose une requête pour évaluation (non bloquant, ne lève jamais)"""
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            self._count('sampled_out')
+            return False
+
+        try:
+            self._queue.put_nowait((features, float(production_price), production_model))
+        except queue.Full:
+            self._count('dropped')
+            return False
+
+        self._count('submitted')
+        return True
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                break
+
+            features, production_price, production_model = item
+            start = time.perf_counter()
+            try:
+                shadow_price = float(self.model.predict(features)[0])
+            except Exception as e:
+                print(f"Erreur du modèle shadow {self.name}: {e}")
+                self._count('errors')
+                continue
+            latency_ms = (time.perf_counter() - start) * 1000
+
+            with self._lock:
+                self._records.append(
+                    (production_model, production_price, shadow_price, latency_ms)
+                )
+                self._counters['scored'] += 1
+
+    def stop(self, timeout=5):
+        """Arrête le thread d'évaluation après les requêtes en attente"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def summary(self):
+        """Statistiques agrégées des écarts et de la latence du modèle shadow"""
+        with self._lock:
+            records = list(self._records)
+            counters = dict(self._counters)
+
+        summary = {
+            'name': self.name,
+            'sample_rate': self.sample_rate,
+            'queue_size': self._queue.qsize(),
+            'queue_capacity': self._queue.maxsize,
+            'counters': counters,
+            'window': len(records)
+        }
+        if not records:
+            return summary
+
+        production = np.array([r[1] for r in records])
+        shadow = np.array([r[2] for r in records])
+        latency = np.array([r[3] for r in records])
+        delta = shadow - production
+        relative = np.abs(delta) / np.where(production == 0, np.nan, production)
+
+        summary['delta'] = {
+            'mean': float(delta.mean()),
+            'mean_absolute': float(np.abs(delta).mean()),
+            'mean_absolute_relative': float(np.nanmean(relative)) if np.isfinite(relative).any() else None,
+            'p50_absolute': float(np.percentile(np.abs(delta), 50)),
+            'p95_absolute': float(np.percentile(np.abs(delta), 95))
+        }
+        summary['latency_ms'] = {
+            'mean': float(latency.mean()),
+            'p50': float(np.percentile(latency, 50)),
+            'p95': float(np.percentile(latency, 95)),
+            'max': float(latency.max())
+        }
+        summary['by_production_model'] = {
+            model_name: sum(1 for r in records if r[0] == model_name)
+            for model_name in sorted({r[0] for r in records})
+        }
+        return summary
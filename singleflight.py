@@ -0,0 +1,97 @@
+"""Coalescence des calculs identiques en cours (single-flight)
+
+Quand plusieurs appelants demandent en même temps le même calcul (même clé),
+un seul l'exécute ; les autres attendent et reçoivent le même résultat (ou la
+même exception). Rien n'est mis en cache : la clé est libérée dès la fin du
+calcul.
+"""
+import asyncio
+import threading
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Version threads (Flask, pools de threads, Streamlit)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'executed': self.executed,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
+
+
+class AsyncSingleFlight:
+    """Version asyncio : les appelants en attente ne bloquent aucun thread"""
+
+    def __init__(self):
+        self._calls = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key, func, *args, **kwargs):
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            # Le calcul partagé est une tâche à part : il n'appartient à aucun
+            # appelant, l'annulation du premier n'atteint pas les autres
+            task = asyncio.ensure_future(func(*args, **kwargs))
+            self._calls[key] = task
+            self.executed += 1
+            task.add_done_callback(lambda done: self._release(key, done))
+
+        # shield : l'annulation d'un appelant n'annule pas le calcul partagé
+        return await asyncio.shield(task)
+
+    def _release(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def stats(self):
+        return {
+            'executed': self.executed,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._calls)
+        }
@@ -0,0 +1,19 @@
+"""Niveaux précision/latence de l'inférence XGBoost
+
+Module sans effet de bord, partagé par l'API et les outils hors ligne
+(evaluate_tiers.py) : l'importer ne charge aucun modèle.
+"""
+
+# Niveaux précision/latence : fraction des arbres XGBoost évalués
+# (les premiers arbres portent l'essentiel de la prédiction)
+INFERENCE_TIERS = {
+    'fast': 0.25,
+    'balanced': 0.5,
+    'full': 1.0
+}
+DEFAULT_TIER = 'full'
+
+
+def tier_tree_count(n_rounds, tier):
+    """Nombre de premiers arbres évalués pour le niveau demandé"""
+    return max(1, int(round(n_rounds * INFERENCE_TIERS[tier])))
@@ -0,0 +1,112 @@
+"""Codes postaux de King County (WA) et estimation locale par proximité"""
+import numpy as np
+
+# Dictionnaire des codes postaux de King County (Seattle area) avec leurs coordonnées approximatives
+KING_COUNTY_ZIPCODES = {
+    98001: (47.3073, -122.2290),  # Auburn
+    98002: (47.2879, -122.2351),  # Auburn
+    98003: (47.3087, -122.3426),  # Federal Way
+    98004: (47.6229, -122.2043),  # Bellevue
+    98005: (47.6168, -122.1460),  # Bellevue
+    98006: (47.5632, -122.1493),  # Bellevue
+    98007: (47.6068, -122.1315),  # Bellevue
+    98008: (47.6168, -122.1196),  # Bellevue
+    98010: (47.2929, -121.9726),  # Black Diamond
+    98011: (47.7523, -122.2054),  # Bothell
+    98014: (47.6473, -121.7868),  # Carnation
+    98019: (47.7301, -122.2054),  # Duvall
+    98022: (47.4262, -121.7826),  # Enumclaw
+    98023: (47.3101, -122.3493),  # Federal Way
+    98024: (47.5373, -121.8232),  # Fall City
+    98027: (47.5262, -122.0326),  # Issaquah
+    98028: (47.7540, -122.2290),  # Kenmore
+    98029: (47.5262, -122.0326),  # Issaquah
+    98030: (47.3837, -122.2176),  # Kent
+    98031: (47.3887, -122.2343),  # Kent
+    98032: (47.3698, -122.2562),  # Kent
+    98033: (47.6779, -122.1910),  # Kirkland
+    98034: (47.7176, -122.1910),  # Kirkland
+    98038: (47.3632, -122.0690),  # Maple Valley
+    98039: (47.6351, -122.2290),  # Medina
+    98040: (47.5718, -122.2176),  # Mercer Island
+    98042: (47.3651, -122.1193),  # Kent
+    98045: (47.4826, -121.7493),  # North Bend
+    98047: (47.2729, -122.3493),  # Pacific
+    98052: (47.6779, -122.1212),  # Redmond
+    98053: (47.6707, -122.0426),  # Redmond
+    98055: (47.4512, -122.2093),  # Renton
+    98056: (47.4873, -122.1910),  # Renton
+    98057: (47.4762, -122.2176),  # Renton
+    98058: (47.4401, -122.1426),  # Renton
+    98059: (47.4873, -122.1193),  # Renton
+    98065: (47.5651, -121.9893),  # Snoqualmie
+    98070: (47.3837, -122.3176),  # Vashon
+    98074: (47.6262, -122.0326),  # Sammamish
+    98075: (47.5762, -122.0326),  # Sammamish
+    98077: (47.7540, -122.0643),  # Woodinville
+    98092: (47.2929, -122.2176),  # Auburn
+    98101: (47.6101, -122.3426),  # Seattle
+    98102: (47.6301, -122.3243),  # Seattle
+    98103: (47.6779, -122.3426),  # Seattle
+    98104: (47.6034, -122.3293),  # Seattle
+    98105: (47.6629, -122.3043),  # Seattle
+    98106: (47.5318, -122.3543),  # Seattle
+    98107: (47.6668, -122.3793),  # Seattle
+    98108: (47.5429, -122.3143),  # Seattle
+    98109: (47.6379, -122.3476),  # Seattle
+    98112: (47.6318, -122.2993),  # Seattle
+    98115: (47.6818, -122.3043),  # Seattle
+    98116: (47.5718, -122.3943),  # Seattle
+    98117: (47.6868, -122.3793),  # Seattle
+    98118: (47.5429, -122.2793),  # Seattle
+    98119: (47.6379, -122.3743),  # Seattle
+    98122: (47.6101, -122.3026),  # Seattle
+    98125: (47.7176, -122.3043),  # Seattle
+    98126: (47.5429, -122.3743),  # Seattle
+    98133: (47.7351, -122.3426),  # Seattle
+    98134: (47.5762, -122.3326),  # Seattle
+    98136: (47.5429, -122.3943),  # Seattle
+    98144: (47.5818, -122.3043),  # Seattle
+    98146: (47.5040, -122.3543),  # Seattle
+    98148: (47.4401, -122.3326),  # Burien
+    98155: (47.7540, -122.3043),  # Seattle
+    98166: (47.4540, -122.3543),  # Burien
+    98168: (47.4929, -122.3043),  # Burien
+    98177: (47.7540, -122.3743),  # Seattle
+    98178: (47.4929, -122.2626),  # Seattle
+    98188: (47.4540, -122.2926),  # SeaTac
+    98198: (47.4079, -122.3326),  # Des Moines
+    98199: (47.6379, -122.3993),  # Seattle
+}
+
+
+def estimate_zipcode_by_proximity(lat, lon):
+    """
+    Estime le code postal basé sur la proximité avec des codes postaux connus de King County, WA
+    """
+    # Calculer la distance avec chaque code postal et retourner le plus proche
+    min_distance = float('inf')
+    closest_zipcode = 98001
+    
+    for zipcode, (zip_lat, zip_lon) in KING_COUNTY_ZIPCODES.items():
+        # Distance euclidienne simple
+        distance = ((lat - zip_lat) ** 2 + (lon - zip_lon) ** 2) ** 0.5
+        if distance < min_distance:
+            min_distance = distance
+            closest_zipcode = zipcode
+    
+    return closest_zipcode
+
+
+def estimate_zipcodes_by_proximity(lats, lons):
+    """
+    Version vectorisée d'estimate_zipcode_by_proximity pour un lot de coordonnées
+    """
+    zipcodes = np.array(list(KING_COUNTY_ZIPCODES))
+    centers = np.array(list(KING_COUNTY_ZIPCODES.values()))
+    
+    lats = np.asarray(lats, dtype=float)[:, None]
+    lons = np.asarray(lons, dtype=float)[:, None]
+    distances = (lats - centers[:, 0]) ** 2 + (lons - centers[:, 1]) ** 2
+    
+    return zipcodes[distances.argmin(axis=1)]